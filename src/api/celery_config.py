@@ -3,11 +3,27 @@ Configuração do Celery para processamento assíncrono de imagens.
 """
 
 from celery import Celery
+from kombu.serialization import register
+import ormsgpack
 import os
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 RABBITMQ_URL = os.getenv("RABBITMQ_URL", "amqp://guest@localhost:5672//")
 
+
+def _ormsgpack_dumps(obj) -> bytes:
+    return ormsgpack.packb(obj, option=ormsgpack.OPT_SERIALIZE_NUMPY | ormsgpack.OPT_NON_STR_KEYS)
+
+
+# Payloads internos (broker/backend) trafegam em msgpack; JSON fica só na API HTTP
+register(
+    "msgpack",
+    _ormsgpack_dumps,
+    ormsgpack.unpackb,
+    content_type="application/x-msgpack",
+    content_encoding="binary"
+)
+
 celery_app = Celery(
     "vision_processor",
     broker=RABBITMQ_URL,
@@ -18,9 +34,10 @@ celery_app = Celery(
 from . import celery_preload
 
 celery_app.conf.update(
-    task_serializer="pickle",
-    accept_content=["pickle", "json"],
-    result_serializer="pickle", 
+    task_serializer="msgpack",
+    accept_content=["msgpack", "json"],
+    result_serializer="msgpack",
+    result_accept_content=["msgpack", "json"],
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
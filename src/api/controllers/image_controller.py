@@ -1,5 +1,7 @@
-import aiofiles
-import uuid
+import asyncio
+import contextlib
+import time
+import secrets
 import os
 from datetime import datetime
 from typing import List, Optional, Dict, Any
@@ -15,7 +17,12 @@ from ...models import (
     ImageUploadResponse, 
     TaskListResponse,
 )
-from ...core.config import UPLOADS_DIR, SUPPORTED_IMAGE_EXTENSIONS
+from ...core.config import UPLOADS_DIR, SUPPORTED_IMAGE_EXTENSIONS, MAX_CONCURRENT_UPLOADS
+
+
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+_CELERY_INSPECT_TTL = 5.0
+_STORAGE_STATS_TTL = 1.0
 
 
 class ImageController:
@@ -24,44 +31,49 @@ class ImageController:
         self.upload_dir.mkdir(exist_ok=True)
         self.result_storage = ResultStorage()
         
-        self.allowed_extensions = SUPPORTED_IMAGE_EXTENSIONS
+        self.allowed_extensions = frozenset(ext.lower() for ext in SUPPORTED_IMAGE_EXTENSIONS)
         
         self.max_file_size = 10 * 1024 * 1024
+        self._upload_semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+        
+        # (timestamp, workers ativos) do último inspect() do Celery
+        self._workers_cache = None
+        self._workers_lock = asyncio.Lock()
+        
+        # (timestamp, estatísticas) da última consulta ao armazenamento
+        self._stats_cache = None
+        self._stats_lock = asyncio.Lock()
     
     async def upload_and_process(self, file: UploadFile) -> ImageUploadResponse:
-        if not file.content_type or not file.content_type.startswith('image/'):
+        content_type = file.content_type
+        if not content_type or not content_type.startswith('image/'):
             raise HTTPException(
                 status_code=400, 
                 detail="Arquivo deve ser uma imagem válida"
             )
         
-        file_extension = Path(file.filename).suffix.lower()
+        filename = file.filename
+        dot = filename.rfind('.')
+        file_extension = filename[dot:].lower() if dot >= 0 else ""
         if file_extension not in self.allowed_extensions:
             raise HTTPException(
                 status_code=400,
                 detail=f"Extensão não suportada. Extensões permitidas: {list(self.allowed_extensions)}"
             )
         
-        content = await file.read()
-        if len(content) > self.max_file_size:
-            raise HTTPException(
-                status_code=413,
-                detail=f"Arquivo muito grande. Tamanho máximo: {self.max_file_size // (1024*1024)}MB"
-            )
-        
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
+        unique_filename = f"{secrets.token_hex(16)}{file_extension}"
         file_path = self.upload_dir / unique_filename
         
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
+        async with self._upload_semaphore:
+            file_size = await self._save_upload(file, file_path)
         
         task = process_image_task.delay(
             str(file_path),
             {
                 "original_filename": file.filename,
                 "uploaded_at": datetime.now().isoformat(),
-                "file_size": len(content),
-                "content_type": file.content_type
+                "file_size": file_size,
+                "content_type": content_type
             }
         )
         
@@ -71,13 +83,43 @@ class ImageController:
             message=f"Imagem enviada para processamento. Use o task_id {task.id} para acompanhar o progresso."
         )
     
+    async def _save_upload(self, file: UploadFile, file_path: Path) -> int:
+        """
+        Grava o upload em disco em blocos de _UPLOAD_CHUNK_SIZE, abortando com 413
+        assim que o total lido ultrapassa max_file_size.
+        
+        Returns:
+            Tamanho do arquivo gravado em bytes
+        """
+        file_size = 0
+        f = await asyncio.to_thread(open, file_path, 'wb')
+        
+        try:
+            while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > self.max_file_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Arquivo muito grande. Tamanho máximo: {self.max_file_size // (1024*1024)}MB"
+                    )
+                await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            f.close()
+            with contextlib.suppress(OSError):
+                os.unlink(file_path)
+            raise
+        
+        f.close()
+        return file_size
+    
     async def get_result(self, task_id: str) -> Dict[str, Any]:
-        result = self.result_storage.get_result(task_id)
+        # As consultas ao banco são bloqueantes e rodam fora do event loop
+        result = await asyncio.to_thread(self.result_storage.get_result, task_id)
         
         if result:
             return format_api_response(result)
         
-        task_metadata = self.result_storage.get_task_metadata(task_id)
+        task_metadata = await asyncio.to_thread(self.result_storage.get_task_metadata, task_id)
         
         if task_metadata:
             if task_metadata.get("status") == "processing":
@@ -114,18 +156,15 @@ class ImageController:
         if limit > 100:
             limit = 100
         
-        if status:
-            tasks = self.result_storage.list_results_by_status(status, limit * page)
-        else:
-            tasks = self.result_storage.list_all_results(limit * page)
-        
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_tasks = tasks[start_idx:end_idx]
+        total, tasks = self.result_storage.list_results_page(
+            offset=(page - 1) * limit,
+            limit=limit,
+            status=status
+        )
         
         return TaskListResponse(
-            tasks=paginated_tasks,
-            total=len(tasks),
+            tasks=tasks,
+            total=total,
             page=page,
             limit=limit
         )
@@ -140,14 +179,9 @@ class ImageController:
         if limit > 1000:
             limit = 1000
         
-        results = self.result_storage.list_results_by_period(
-            start_date, end_date, limit
+        return self.result_storage.list_results_by_period(
+            start_date, end_date, limit, status=status
         )
-        
-        if status:
-            results = [r for r in results if r.get("status") == status]
-        
-        return results
     
     async def delete_result(self, task_id: str) -> Dict[str, str]:
         success = self.result_storage.delete_result(task_id)
@@ -161,12 +195,35 @@ class ImageController:
         return {"message": f"Resultado {task_id} removido com sucesso"}
     
     async def get_storage_stats(self) -> Dict[str, Any]:
-        return self.result_storage.get_storage_stats()
+        async with self._stats_lock:
+            if (self._stats_cache is not None and
+                    time.monotonic() - self._stats_cache[0] < _STORAGE_STATS_TTL):
+                return self._stats_cache[1]
+            
+            stats = await asyncio.to_thread(self.result_storage.get_storage_stats)
+            self._stats_cache = (time.monotonic(), stats)
+            return stats
+    
+    async def _get_active_workers(self) -> Optional[Dict[str, Any]]:
+        """
+        Consulta os workers ativos do Celery, reaproveitando o resultado por
+        _CELERY_INSPECT_TTL segundos. Health checks concorrentes compartilham
+        um único broadcast.
+        """
+        async with self._workers_lock:
+            if (self._workers_cache is not None and
+                    time.monotonic() - self._workers_cache[0] < _CELERY_INSPECT_TTL):
+                return self._workers_cache[1]
+            
+            active_workers = await asyncio.to_thread(
+                lambda: celery_app.control.inspect().active()
+            )
+            self._workers_cache = (time.monotonic(), active_workers)
+            return active_workers
     
     async def health_check(self) -> Dict[str, Any]:
         db_health = self.result_storage.health_check()
-        celery_inspect = celery_app.control.inspect()
-        active_workers = celery_inspect.active()
+        active_workers = await self._get_active_workers()
         
         celery_health = {
             "status": "healthy" if active_workers else "unhealthy",
@@ -175,11 +232,16 @@ class ImageController:
         }
         
         from ...core.config import QR_CROPS_DIR, OUTPUTS_DIR
-        directories_health = {
-            "uploads_dir": os.path.exists(UPLOADS_DIR),
-            "qr_crops_dir": os.path.exists(QR_CROPS_DIR),
-            "outputs_dir": os.path.exists(OUTPUTS_DIR)
+        directories = {
+            "uploads_dir": UPLOADS_DIR,
+            "qr_crops_dir": QR_CROPS_DIR,
+            "outputs_dir": OUTPUTS_DIR
         }
+        # Os stats rodam em paralelo no threadpool e não travam o event loop
+        exists = await asyncio.gather(
+            *(asyncio.to_thread(os.path.exists, path) for path in directories.values())
+        )
+        directories_health = dict(zip(directories, exists))
         
         overall_status = "healthy"
         if (db_health["status"] != "healthy" or 
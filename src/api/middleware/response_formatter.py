@@ -6,6 +6,37 @@ from typing import Dict, Any
 from datetime import datetime
 
 
+_EMPTY: Dict[str, Any] = {}
+
+
+def _format_object(obj: Dict[str, Any]) -> Dict[str, Any]:
+    bbox = obj.get("bounding_box") or _EMPTY
+    return {
+        "object_id": obj.get("object_id"),
+        "class": obj.get("class"),
+        "confidence": obj.get("confidence"),
+        "bounding_box": {
+            "x": bbox.get("x"),
+            "y": bbox.get("y"),
+            "width": bbox.get("width"),
+            "height": bbox.get("height")
+        }
+    }
+
+
+def _format_qr_code(qr: Dict[str, Any]) -> Dict[str, Any]:
+    position = qr.get("position") or _EMPTY
+    return {
+        "qr_id": qr.get("qr_id"),
+        "content": qr.get("content"),
+        "position": {
+            "x": position.get("x"),
+            "y": position.get("y")
+        },
+        "confidence": qr.get("confidence")
+    }
+
+
 def format_api_response(result: Dict[str, Any]) -> Dict[str, Any]:
     """
     Formata a resposta da API para seguir o padrão esperado.
@@ -23,35 +54,10 @@ def format_api_response(result: Dict[str, Any]) -> Dict[str, Any]:
     if "scan_metadata" not in result:
         return result
     
-    formatted_objects = []
-    for obj in result.get("detected_objects", []):
-        formatted_obj = {
-            "object_id": obj.get("object_id"),
-            "class": obj.get("class"),
-            "confidence": obj.get("confidence"),
-            "bounding_box": {
-                "x": obj.get("bounding_box", {}).get("x"),
-                "y": obj.get("bounding_box", {}).get("y"),
-                "width": obj.get("bounding_box", {}).get("width"),
-                "height": obj.get("bounding_box", {}).get("height")
-            }
-        }
-        formatted_objects.append(formatted_obj)
-    
-    formatted_qr_codes = []
-    for qr in result.get("qr_codes", []):
-        formatted_qr = {
-            "qr_id": qr.get("qr_id"),
-            "content": qr.get("content"),
-            "position": {
-                "x": qr.get("position", {}).get("x"),
-                "y": qr.get("position", {}).get("y")
-            },
-            "confidence": qr.get("confidence")
-        }
-        formatted_qr_codes.append(formatted_qr)
+    formatted_objects = [_format_object(obj) for obj in result.get("detected_objects", ())]
+    formatted_qr_codes = [_format_qr_code(qr) for qr in result.get("qr_codes", ())]
     
-    scan_metadata = result.get("scan_metadata", {})
+    scan_metadata = result["scan_metadata"] or _EMPTY
     formatted_metadata = {
         "timestamp": scan_metadata.get("timestamp"),
         "image_resolution": scan_metadata.get("image_resolution"),
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, File, UploadFile, Query
+from fastapi.responses import ORJSONResponse
 
 from ..controllers.image_controller import image_controller
 from ...models import (
@@ -31,7 +32,9 @@ async def upload_image(file: UploadFile = File(...)):
 @router.get("/results/{task_id}")
 async def get_task_result(task_id: str):
     """Obtém o resultado completo de uma task."""
-    return await image_controller.get_result(task_id)
+    # O resultado já vem do banco com tipos JSON nativos; retornar a resposta
+    # pronta evita a passada extra do jsonable_encoder sobre o payload.
+    return ORJSONResponse(content=await image_controller.get_result(task_id))
 
 
 @router.get("/results", response_model=TaskListResponse)
@@ -5,7 +5,7 @@ Serviço para armazenamento e recuperação de resultados de processamento.
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 from ...core.logging_config import get_logger
 from sqlalchemy import and_
@@ -113,20 +113,59 @@ class ResultStorage:
         finally:
             db.close()
     
+    def list_results_page(
+        self,
+        offset: int,
+        limit: int,
+        status: Optional[str] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Retorna o total de tasks e apenas a janela [offset, offset + limit),
+        paginada no próprio banco.
+        """
+        db = self._get_db()
+        try:
+            query = db.query(VisionTask)
+            if status:
+                query = query.filter_by(status=status)
+            
+            total = query.count()
+            tasks = query.order_by(VisionTask.created_at.desc()).offset(offset).limit(limit).all()
+            
+            results = []
+            for task in tasks:
+                results.append({
+                    "task_id": task.task_id,
+                    "status": task.status,
+                    "created_at": task.created_at.isoformat(),
+                    "has_result": task.has_result
+                })
+            return total, results
+        except SQLAlchemyError as e:
+            logger.error(f"Erro ao paginar resultados: {e}")
+            return 0, []
+        finally:
+            db.close()
+    
     def list_results_by_period(
         self, 
         start_date: datetime, 
         end_date: datetime,
-        limit: int = 100
+        limit: int = 100,
+        status: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         db = self._get_db()
         try:
-            tasks = db.query(VisionTask).filter(
+            query = db.query(VisionTask).filter(
                 and_(
                     VisionTask.created_at >= start_date,
                     VisionTask.created_at <= end_date
                 )
-            ).order_by(VisionTask.created_at.desc()).limit(limit).all()
+            )
+            if status:
+                query = query.filter(VisionTask.status == status)
+            
+            tasks = query.order_by(VisionTask.created_at.desc()).limit(limit).all()
             
             results = []
             for task in tasks:
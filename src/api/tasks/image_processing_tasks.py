@@ -87,12 +87,15 @@ def process_image_core(
     model_path: str = DEFAULT_MODEL_PATH
 ) -> Dict[str, Any]:
     processor = create_vision_processor(model_path, config)
-    return processor.process_image(
-        image_path,
-        save_qr_crops=config.get("save_crops", False),  
-        return_visualization=False,
-        remove_source_file=True
-    )
+    try:
+        return processor.process_image(
+            image_path,
+            save_qr_crops=config.get("save_crops", False),  
+            return_visualization=False,
+            remove_source_file=True
+        )
+    finally:
+        processor.close()
 
 
 @celery_app.task(bind=True)
@@ -13,7 +13,8 @@ from .utils.helpers import (
 from .utils.coordinate_utils import (
     convert_coordinates_to_original,
     convert_detections_to_original,
-    validate_coordinates
+    validate_coordinates,
+    validate_coordinates_batch
 )
 from .config import (
     DEFAULT_MODEL_PATH,
@@ -35,6 +36,7 @@ __all__ = [
     "convert_coordinates_to_original",
     "convert_detections_to_original", 
     "validate_coordinates",
+    "validate_coordinates_batch",
     "DEFAULT_MODEL_PATH",
     "DEFAULT_CONFIG",
     "QR_CROPS_DIR",
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent.parent  
@@ -39,6 +40,15 @@ DETECTION_CONFIG = {
     "iou_threshold": 0.45
 }
 
+# Número máximo de imagens processadas em paralelo por process_batch
+BATCH_MAX_WORKERS = 4
+
+# Imagens por chamada do modelo em YOLODetector.detect_batch
+DETECTION_BATCH_SIZE = 8
+
+# Uploads lidos/gravados simultaneamente pela API
+MAX_CONCURRENT_UPLOADS = int(os.getenv("MAX_CONCURRENT_UPLOADS", "8"))
+
 SUPPORTED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
 
 API_CONFIG = {
@@ -5,21 +5,60 @@ Módulo de detecção de objetos usando YOLO.
 import cv2
 import numpy as np
 import os
+import threading
+from concurrent.futures import Executor
 from typing import Dict, List, Optional, Tuple
-from ultralytics import YOLO
-import torch
 
 from ..logging_config import get_logger
+from ..utils.helpers import write_image
 
 logger = get_logger(__name__)
 
+# Ultralytics (e torch) só são importados ao criar o primeiro detector
+YOLO = None
+
+# Modelos exportados (TensorRT/ONNX) já têm a precisão (FP16/INT8) fixada na exportação
+EXPORTED_MODEL_SUFFIXES = (".engine", ".onnx")
+
+
+def _get_yolo():
+    global YOLO
+    if YOLO is None:
+        from ultralytics import YOLO as _YOLO
+        YOLO = _YOLO
+    return YOLO
+
+
 class YOLODetector:
-    def __init__(self, model_path: str, confidence_threshold: float = 0.5):
+    def __init__(
+        self,
+        model_path: str,
+        confidence_threshold: float = 0.5,
+        half: bool = True,
+        compile_model: bool = False,
+        classes: Optional[List[int]] = None,
+        warmup: bool = False
+    ):
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
+        # Filtro de classes aplicado pelo Ultralytics no NMS, antes de copiar as caixas para a CPU
+        self.classes = classes
+        self.exported = model_path.lower().endswith(EXPORTED_MODEL_SUFFIXES)
+        # FP16 só compensa (e só é suportado pelo Ultralytics) em GPU CUDA
+        self.half = half and not self.exported and _cuda_available()
         self.model = None
         self.class_names = {}
+        self._class_table: Tuple[Tuple[str, bool], ...] = ()
+        self._inference_lock = threading.Lock()
         self._load_model()
+        # torch.compile só traz ganho com CUDA graphs; em CPU a flag é ignorada
+        self.compiled = compile_model and not self.exported and _cuda_available() and self._compile_model()
+        # O modelo compilado já passou por uma inferência de aquecimento
+        if warmup and not self.compiled:
+            try:
+                self._warmup()
+            except Exception as e:
+                logger.warning(f"Falha na inferência de aquecimento do YOLO: {e}")
     
     def _load_model(self):
         try:
@@ -33,18 +72,65 @@ class YOLODetector:
             torch.load = safe_load
             
             try:
-                self.model = YOLO(self.model_path)
+                # O Ultralytics carrega .engine/.onnx com o backend certo, mas não deduz a tarefa
+                load_kwargs = {"task": "detect"} if self.exported else {}
+                self.model = _get_yolo()(self.model_path, **load_kwargs)
             finally:
                 torch.load = original_load
             
             if hasattr(self.model.model, 'names'):
-                self.class_names = self.model.model.names
-            logger.info(f"Modelo YOLOv8 carregado com sucesso: {self.model_path}")
+                self._set_class_names(self.model.model.names)
+            logger.info(f"Modelo YOLOv8 carregado com sucesso: {self.model_path} (fp16={self.half})")
             
         except Exception as e:
             logger.error(f"Erro ao carregar modelo YOLOv8: {e}")
             raise RuntimeError(f"Falha no carregamento do modelo: {e}")
     
+    def _set_class_names(self, class_names: Dict[int, str]):
+        """
+        Guarda os nomes das classes e monta a tabela indexada por class_id com
+        (nome, é QR/barcode), resolvida uma vez por modelo e não por detecção.
+        """
+        self.class_names = class_names
+        size = max(class_names) + 1 if class_names else 0
+        table = []
+        for cls_id in range(size):
+            name = class_names.get(cls_id, f"class_{cls_id}")
+            lowered = name.lower()
+            table.append((name, "qr" in lowered or "barcode" in lowered))
+        self._class_table = tuple(table)
+    
+    def _warmup(self):
+        """
+        Roda uma inferência com imagem preta, para que a configuração do predictor,
+        o autotuning do cuDNN e a alocação de memória não recaiam sobre o primeiro frame real.
+        """
+        dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+        with self._inference_lock:
+            self.model(dummy, conf=self.confidence_threshold, classes=self.classes, half=self.half, verbose=False)
+        logger.info(f"Inferência de aquecimento do YOLO concluída: {self.model_path}")
+    
+    def _compile_model(self) -> bool:
+        """
+        Compila o forward do modelo com torch.compile e faz uma inferência de
+        aquecimento, pagando o custo da compilação já na carga.
+        
+        Returns:
+            True se o modelo compilado ficou em uso
+        """
+        import torch
+        
+        original_model = self.model.model
+        try:
+            self.model.model = torch.compile(original_model, mode="reduce-overhead", fullgraph=False)
+            self._warmup()
+            logger.info(f"Modelo YOLOv8 compilado com torch.compile: {self.model_path}")
+            return True
+        except Exception as e:
+            self.model.model = original_model
+            logger.warning(f"torch.compile falhou, usando o modelo sem compilar: {e}")
+            return False
+    
     def detect(
         self, 
         image: np.ndarray,
@@ -54,18 +140,66 @@ class YOLODetector:
         if confidence is None:
             confidence = self.confidence_threshold
 
+        image_bgr = self._to_bgr(image)
+        with self._inference_lock:
+            results = self.model(
+                image_bgr, conf=confidence, classes=self.classes, half=self.half, verbose=False
+            )
+        
+        detections = self._process_results(results[0], image, return_crops)
+        return detections
+    
+    def detect_batch(
+        self,
+        images: List[np.ndarray],
+        confidence: Optional[float] = None,
+        return_crops: bool = False,
+        batch_size: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Executa a detecção em várias imagens, com uma chamada do modelo por lote.
+        
+        Args:
+            images: Imagens RGB a processar
+            confidence: Limiar de confiança (padrão: o do detector)
+            return_crops: Se deve retornar recortes dos objetos
+            batch_size: Imagens por chamada do modelo (padrão: DETECTION_BATCH_SIZE)
+            
+        Returns:
+            Lista de detecções, na mesma ordem e formato de detect()
+        """
+        from ..config import DETECTION_BATCH_SIZE
+        
+        if confidence is None:
+            confidence = self.confidence_threshold
+        batch_size = batch_size or DETECTION_BATCH_SIZE
+        
+        detections = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            batch_bgr = [self._to_bgr(image) for image in chunk]
+            with self._inference_lock:
+                results = self.model(
+                    batch_bgr, conf=confidence, classes=self.classes, half=self.half, verbose=False
+                )
+            
+            for result, image in zip(results, chunk):
+                detections.append(self._process_results(result, image, return_crops))
+        
+        return detections
+    
+    @staticmethod
+    def _to_bgr(image: np.ndarray) -> np.ndarray:
         if len(image.shape) == 3 and image.dtype == np.float32:
             image_bgr = (image * 255).astype(np.uint8)
 
         else:
-            image_bgr = image.astype(np.uint8)
+            # Entrada já uint8 (caso do VisionProcessor) segue sem cópia até o cvtColor
+            image_bgr = image.astype(np.uint8, copy=False)
         
         if image_bgr.shape[2] == 3:
             image_bgr = cv2.cvtColor(image_bgr, cv2.COLOR_RGB2BGR)
-        results = self.model(image_bgr, conf=confidence, verbose=False)
-        
-        detections = self._process_results(results[0], image, return_crops)
-        return detections
+        return image_bgr
     
     def _process_results(
         self, 
@@ -95,30 +229,44 @@ class YOLODetector:
         }
         
         import uuid
+        if self.exported and not self.class_names:
+            # Modelos exportados só expõem as classes nos resultados da inferência
+            self._set_class_names(result.names)
+        
         if result.boxes is not None and len(result.boxes) > 0:
-            boxes = result.boxes.xyxy.cpu().numpy()  
-            scores = result.boxes.conf.cpu().numpy() 
-            classes = result.boxes.cls.cpu().numpy() 
+            # Uma única cópia GPU->CPU: data traz [x1, y1, x2, y2, (track_id,) conf, cls] por linha
+            data = result.boxes.data.cpu().numpy()
+            # Conversões feitas em bloco; tolist() já entrega int/float nativos do Python
+            boxes = data[:, :4].astype(int)
+            sizes = boxes[:, 2:] - boxes[:, :2]
+            rows = zip(
+                boxes.tolist(),
+                sizes.tolist(),
+                data[:, -2].tolist(),
+                data[:, -1].astype(int).tolist()
+            )
             
-            for i, (box, score, cls_id) in enumerate(zip(boxes, scores, classes)):
-                x1, y1, x2, y2 = box.astype(int)
-                class_name = self.class_names.get(int(cls_id), f"class_{int(cls_id)}")
+            for (x1, y1, x2, y2), (width, height), score, cls_id in rows:
+                if 0 <= cls_id < len(self._class_table):
+                    class_name, is_qr = self._class_table[cls_id]
+                else:
+                    class_name, is_qr = f"class_{cls_id}", False
                 detection_data = {
-                    "confidence": float(score),
+                    "confidence": score,
                     "bounding_box": {
-                        "x": int(x1),
-                        "y": int(y1),
-                        "width": int(x2 - x1),
-                        "height": int(y2 - y1)
+                        "x": x1,
+                        "y": y1,
+                        "width": width,
+                        "height": height
                     },
                     "class": class_name,
-                    "class_id": int(cls_id)
+                    "class_id": cls_id
                 }
                 if return_crops:
                     crop = original_image[y1:y2, x1:x2]
                     detection_data["crop"] = crop
                 unique_id = str(uuid.uuid4())
-                if "qr" in class_name.lower() or "barcode" in class_name.lower():
+                if is_qr:
                     detection_data["qr_id"] = f"QR_{unique_id}"
                     detections["qr_codes"].append(detection_data)
                 else:
@@ -142,7 +290,8 @@ class YOLODetector:
         self, 
         image: np.ndarray,
         detections: Dict,
-        save_directory: Optional[str] = None
+        save_directory: Optional[str] = None,
+        io_executor: Optional[Executor] = None
     ) -> List[Dict]:
         """
         Extrai crops dos QR codes detectados com margem adicional.
@@ -151,6 +300,7 @@ class YOLODetector:
             image: Imagem original
             detections: Resultados da detecção
             save_directory: Diretório para salvar os crops (opcional)
+            io_executor: Executor para gravar os crops em segundo plano (opcional)
             
         Returns:
             Lista com informações dos crops dos QR codes
@@ -158,19 +308,18 @@ class YOLODetector:
         qr_crops = []
         margin = 5  
         
-        for i, qr_detection in enumerate(detections["qr_codes"]):
+        qr_detections = detections["qr_codes"]
+        if not qr_detections:
+            return qr_crops
+        
+        img_height, img_width = image.shape[:2]
+        bounds = _compute_crop_bounds(
+            [qr_detection["bounding_box"] for qr_detection in qr_detections],
+            img_height, img_width, margin
+        )
+        
+        for qr_detection, (x1_margin, y1_margin, x2_margin, y2_margin) in zip(qr_detections, bounds):
             bbox = qr_detection["bounding_box"]
-            x1 = bbox["x"]
-            y1 = bbox["y"]
-            x2 = x1 + bbox["width"]
-            y2 = y1 + bbox["height"]
-            
-            img_height, img_width = image.shape[:2]
-            
-            x1_margin = max(0, x1 - margin)
-            y1_margin = max(0, y1 - margin)
-            x2_margin = min(img_width, x2 + margin)
-            y2_margin = min(img_height, y2 + margin)
 
             crop = image[y1_margin:y2_margin, x1_margin:x2_margin]
             
@@ -180,7 +329,7 @@ class YOLODetector:
                 "confidence": qr_detection["confidence"],
                 "position": {"x": x1_margin, "y": y1_margin},
                 "size": {"width": x2_margin - x1_margin, "height": y2_margin - y1_margin},
-                "original_bbox": {"x": x1, "y": y1, "width": bbox["width"], "height": bbox["height"]},
+                "original_bbox": {"x": bbox["x"], "y": bbox["y"], "width": bbox["width"], "height": bbox["height"]},
                 "margin_applied": margin
             }
             
@@ -190,7 +339,10 @@ class YOLODetector:
                 crop_path = os.path.join(save_directory, crop_filename)
                 
                 crop_bgr = cv2.cvtColor(crop, cv2.COLOR_RGB2BGR)
-                cv2.imwrite(crop_path, crop_bgr)
+                if io_executor is not None:
+                    crop_info["save_future"] = io_executor.submit(write_image, crop_path, crop_bgr)
+                else:
+                    crop_info["saved"] = write_image(crop_path, crop_bgr)
                 
                 crop_info["saved_path"] = crop_path
             
@@ -264,23 +416,61 @@ class YOLODetector:
         cv2.putText(image, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
 
+def _cuda_available() -> bool:
+    import torch
+    return torch.cuda.is_available()
+
+
+def _compute_crop_bounds(
+    bboxes: List[Dict],
+    img_height: int,
+    img_width: int,
+    margin: int
+) -> List[List[int]]:
+    """
+    Calcula de uma vez os limites (x1, y1, x2, y2) dos crops, com margem e
+    limitados à imagem.
+    """
+    if not bboxes:
+        return []
+    
+    if len(bboxes) == 1:
+        # Caso mais comum (um QR por frame): aritmética escalar, sem montar array
+        b = bboxes[0]
+        return [[
+            max(0, b["x"] - margin),
+            max(0, b["y"] - margin),
+            min(img_width, b["x"] + b["width"] + margin),
+            min(img_height, b["y"] + b["height"] + margin)
+        ]]
+    
+    boxes = np.array(
+        [[b["x"], b["y"], b["x"] + b["width"], b["y"] + b["height"]] for b in bboxes],
+        dtype=np.int64
+    )
+    boxes[:, :2] = np.maximum(boxes[:, :2] - margin, 0)
+    boxes[:, 2] = np.minimum(boxes[:, 2] + margin, img_width)
+    boxes[:, 3] = np.minimum(boxes[:, 3] + margin, img_height)
+    return boxes.tolist()
+
+
 class YOLODetectorSingleton:
-    _instance = None
-    _model_path = None
-    _confidence_threshold = None
+    # Um detector por modelo. O limiar de quem criou a instância vira o padrão dela;
+    # os demais chamadores passam a própria confiança em detect(), sem alterar a instância compartilhada
+    _instances: Dict[str, YOLODetector] = {}
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls, model_path: str, confidence_threshold: float = 0.5):
-        if (
-            cls._instance is None or
-            cls._model_path != model_path or
-            cls._confidence_threshold != confidence_threshold
-        ):
-            logger.info(f"Carregando modelo YOLO singleton: {model_path}")
-            cls._instance = YOLODetector(model_path, confidence_threshold)
-            cls._model_path = model_path
-            cls._confidence_threshold = confidence_threshold
-        else:
-            logger.debug("Reutilizando modelo YOLO já carregado em memória")
+        instance = cls._instances.get(model_path)
+        if instance is None:
+            with cls._lock:
+                instance = cls._instances.get(model_path)
+                if instance is None:
+                    logger.info(f"Carregando modelo YOLO singleton: {model_path}")
+                    instance = YOLODetector(model_path, confidence_threshold, warmup=True)
+                    cls._instances[model_path] = instance
+                    return instance
         
-        return cls._instance
\ No newline at end of file
+        logger.debug("Reutilizando modelo YOLO já carregado em memória")
+        return instance
@@ -4,8 +4,15 @@ Módulo de pré-processamento de imagens para padronização antes da detecção
 
 import cv2
 import numpy as np
+import threading
 from typing import Tuple, Optional
 
+# Correção gama (1.2) tabelada para os 256 valores de uint8; mesma fórmula
+# aplicada antes pixel a pixel em float32
+_GAMMA_LUT = (
+    np.power(np.arange(256, dtype=np.float32) / 255.0, 1.2) * 255
+).astype(np.uint8)
+
 class ImagePreprocessor:
     """
     Classe responsável pelo pré-processamento de imagens para otimizar
@@ -32,6 +39,8 @@ class ImagePreprocessor:
         self.normalize = normalize
         self.enhance_contrast = enhance_contrast
         self.minimal_preprocessing = minimal_preprocessing
+        # Buffer de letterbox reutilizado entre chamadas (um por thread)
+        self._buffers = threading.local()
     
     def load_image(self, image_path: str) -> np.ndarray:
         image = cv2.imread(image_path)
@@ -41,10 +50,23 @@ class ImagePreprocessor:
         image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         return image
     
+    def load_image_from_bytes(self, data: bytes) -> np.ndarray:
+        """
+        Decodifica uma imagem já em memória (ex.: corpo de um upload), sem
+        passar pelo disco.
+        """
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Não foi possível decodificar a imagem a partir dos bytes recebidos")
+        
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return image
+    
     def resize_image(
         self, 
         image: np.ndarray, 
-        target_size: Optional[Tuple[int, int]] = None
+        target_size: Optional[Tuple[int, int]] = None,
+        reuse_buffer: bool = False
     ) -> Tuple[np.ndarray, float]:
         if target_size is None:
             target_size = self.target_size
@@ -57,42 +79,67 @@ class ImagePreprocessor:
         new_w = int(w * scale)
         new_h = int(h * scale)
         
-        resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
-        
-        padded = np.zeros((target_h, target_w, 3), dtype=np.uint8)
         y_offset = (target_h - new_h) // 2
         x_offset = (target_w - new_w) // 2
-        padded[y_offset:y_offset+new_h, x_offset:x_offset+new_w] = resized
+        
+        if reuse_buffer:
+            padded = self._get_letterbox_buffer(target_h, target_w)
+            padded[:y_offset] = 0
+            padded[y_offset+new_h:] = 0
+            padded[:, :x_offset] = 0
+            padded[:, x_offset+new_w:] = 0
+        else:
+            padded = np.zeros((target_h, target_w, 3), dtype=np.uint8)
+        
+        # Redimensiona direto na região central do letterbox, sem array intermediário
+        cv2.resize(
+            image,
+            (new_w, new_h),
+            dst=padded[y_offset:y_offset+new_h, x_offset:x_offset+new_w],
+            interpolation=cv2.INTER_LINEAR
+        )
         
         return padded, scale
     
+    def _get_letterbox_buffer(self, target_h: int, target_w: int) -> np.ndarray:
+        buffer = getattr(self._buffers, "letterbox", None)
+        if buffer is None or buffer.shape[:2] != (target_h, target_w):
+            buffer = np.empty((target_h, target_w, 3), dtype=np.uint8)
+            self._buffers.letterbox = buffer
+        return buffer
+    
     def enhance_image_quality(self, image: np.ndarray) -> np.ndarray:
-        enhanced = image.copy()
+        """
+        Aplica a correção gama quando enhance_contrast está ativo.
         
-        if self.enhance_contrast:
-            enhanced_float = enhanced.astype(np.float32) / 255.0
-            gamma = 1.2  
-            enhanced_float = np.power(enhanced_float, gamma)
-            enhanced = (enhanced_float * 255).astype(np.uint8)
+        Sem realce, a própria imagem de entrada é devolvida (sem cópia); quem
+        chama não deve alterá-la in-place.
+        """
+        if not self.enhance_contrast:
+            return image
         
-        return enhanced
+        return cv2.LUT(image, _GAMMA_LUT)
     
     def preprocess(
         self, 
         image: np.ndarray,
         return_metadata: bool = True
     ) -> Tuple[np.ndarray, dict]:
+        """
+        Pré-processa a imagem para a detecção.
+        
+        A imagem retornada é uma view sobre o buffer de letterbox da thread atual
+        e deve ser tratada como somente leitura até a próxima chamada; o método não
+        é reentrante dentro da mesma thread.
+        """
         original_shape = image.shape[:2]  
         
         if self.minimal_preprocessing:
-            resized, scale_factor = self.resize_image(image)
-            processed = resized.copy()
+            processed, scale_factor = self.resize_image(image, reuse_buffer=True)
         else:
+            # O buffer já é uint8, então a normalização para [0, 255] não exige uma passada extra
             enhanced = self.enhance_image_quality(image)
-            resized, scale_factor = self.resize_image(enhanced)
-            processed = resized.copy()
-            if self.normalize:
-                processed = np.clip(processed, 0, 255).astype(np.uint8)
+            processed, scale_factor = self.resize_image(enhanced, reuse_buffer=True)
         
         metadata = {}
         if return_metadata:
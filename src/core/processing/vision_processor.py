@@ -8,15 +8,16 @@ import numpy as np
 import os
 import time
 from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from ..detection.yolo_detector import YOLODetectorSingleton
 from ..logging_config import get_logger
 from .image_preprocessor import ImagePreprocessor
 from .qr_decoder import QRDecoder
-from ..utils.coordinate_utils import convert_detections_to_original, validate_coordinates
+from ..utils.helpers import write_image
+from ..utils.coordinate_utils import convert_detections_to_original, validate_coordinates_batch
 
 logger = get_logger(__name__)
 
@@ -30,9 +31,10 @@ class VisionProcessor:
         confidence_threshold: float = 0.85,
         enable_qr_detection: bool = True,
         save_crops: bool = True,
-        save_processed_images: bool = True
+        save_processed_images: bool = True,
+        batch_workers: int = None
     ):
-        from ..config import DEFAULT_MODEL_PATH, QR_CROPS_DIR, PROCESSED_IMAGES_DIR
+        from ..config import DEFAULT_MODEL_PATH, QR_CROPS_DIR, PROCESSED_IMAGES_DIR, BATCH_MAX_WORKERS
         
         self.model_path = model_path or DEFAULT_MODEL_PATH
         self.qr_crops_dir = qr_crops_dir or QR_CROPS_DIR
@@ -41,6 +43,8 @@ class VisionProcessor:
         self.enable_qr_detection = enable_qr_detection
         self.save_crops = save_crops
         self.save_processed_images = save_processed_images
+        self.batch_workers = batch_workers or BATCH_MAX_WORKERS
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
         
         self.preprocessor = ImagePreprocessor(
             target_size=(640, 640),
@@ -73,14 +77,23 @@ class VisionProcessor:
         remove_source_file: bool = False
     ) -> Dict:
         start_time = time.time()
+        now = datetime.now()
         
         if isinstance(image_input, str):
             original_image = self.preprocessor.load_image(image_input)
             image_source = image_input
+        elif isinstance(image_input, (bytes, bytearray, memoryview)):
+            original_image = self.preprocessor.load_image_from_bytes(image_input)
+            image_source = "bytes"
         else:
-            original_image = image_input.copy()
+            # Nenhuma etapa do pipeline altera original_image (pré-processamento,
+            # crops e visualização trabalham em cópias), então a cópia é evitada.
+            original_image = np.ascontiguousarray(image_input)
             image_source = "array"
         
+        h, w = original_image.shape[:2]
+        img_shape = (h, w)
+        
         processed_image, preprocessing_metadata = self.preprocessor.preprocess(
             original_image, return_metadata=True
         )
@@ -93,65 +106,83 @@ class VisionProcessor:
         
         original_detections = convert_detections_to_original(detections, preprocessing_metadata)
         
-        for obj in original_detections["detected_objects"]:
-            obj["bounding_box"] = validate_coordinates(
-                obj["bounding_box"], original_image.shape[:2]
+        classes_detected = original_detections["summary"]["classes_detected"]
+        if not self.enable_qr_detection:
+            original_detections["qr_codes"] = []
+            classes_detected = [name for name in classes_detected if name != "qr_code"]
+        
+        formatted_objects = self._finalize_objects(original_detections["detected_objects"], h, w)
+        validate_coordinates_batch(original_detections["qr_codes"], img_shape)
+        
+        # A visualização só depende das caixas já validadas: a imagem processada é
+        # gravada no pool de I/O enquanto os QR codes são decodificados
+        vis_image = None
+        if return_visualization or self.save_processed_images:
+            vis_image = self.detector.visualize_detections(
+                original_image, original_detections, show_confidence=True
             )
         
-        for qr in original_detections["qr_codes"]:
-            qr["bounding_box"] = validate_coordinates(
-                qr["bounding_box"], original_image.shape[:2]
+        processed_image_save = None
+        if self.save_processed_images:
+            processed_image_save = self._save_processed_image(
+                original_image, original_detections, image_source, now,
+                vis_image_cached=vis_image
             )
+        
         qr_crops_info = []
-        if original_detections["qr_codes"]:
-            qr_crops_info = self.detector.get_qr_crops(
-                original_image,
-                original_detections,
-                save_directory=self.qr_crops_dir if save_qr_crops else None
-            )
+        direct_qr_codes = []
+        if self.enable_qr_detection:
+            if original_detections["qr_codes"]:
+                qr_crops_info = self.detector.get_qr_crops(
+                    original_image,
+                    original_detections,
+                    save_directory=self.qr_crops_dir if save_qr_crops else None,
+                    io_executor=self._io_pool
+                )
+                
+                for crop_info in qr_crops_info:
+                    if crop_info.get("crop_array") is not None:
+                        qr_id = crop_info.get("qr_id", "QR_UNKNOWN")
+                        qr_content = self.qr_decoder.decode_multiple_attempts(crop_info["crop_array"], qr_id)
+                        crop_info["decoded_content"] = qr_content or "DECODE_FAILED"
+                
+                # As gravações dos crops rodam no pool de I/O durante a decodificação
+                for crop_info in qr_crops_info:
+                    save_future = crop_info.pop("save_future", None)
+                    if save_future is not None:
+                        crop_info["saved"] = save_future.result()
             
-            for crop_info in qr_crops_info:
-                if crop_info.get("crop_array") is not None:
-                    qr_id = crop_info.get("qr_id", "QR_UNKNOWN")
-                    qr_content = self.qr_decoder.decode_multiple_attempts(crop_info["crop_array"], qr_id)
-                    crop_info["decoded_content"] = qr_content or "DECODE_FAILED"
-        
-        direct_qr_codes = self.qr_decoder.decode_qr_from_image(original_image)
+            direct_qr_codes = self.qr_decoder.decode_qr_from_image(original_image)
         
         processing_time = (time.time() - start_time) * 1000
         
         result = {
             "scan_metadata": {
-                "timestamp": datetime.now().isoformat() + "Z",
-                "image_resolution": f"{original_image.shape[1]}x{original_image.shape[0]}",
+                "timestamp": now.isoformat() + "Z",
+                "image_resolution": f"{w}x{h}",
                 "processing_time_ms": int(processing_time),
                 "image_source": image_source,
                 "preprocessing": preprocessing_metadata
             },
-            "detected_objects": self._format_objects(original_detections["detected_objects"]),
+            "detected_objects": formatted_objects,
             "qr_codes": self._format_qr_codes(original_detections["qr_codes"], qr_crops_info, direct_qr_codes),
             "summary": {
                 "total_detections": len(original_detections["detected_objects"]) + len(original_detections["qr_codes"]),
                 "objects_count": len(original_detections["detected_objects"]),
                 "qr_codes_count": len(original_detections["qr_codes"]),
-                "classes_detected": original_detections["summary"]["classes_detected"],
-                "qr_crops_saved": len(qr_crops_info) if save_qr_crops else 0,
+                "classes_detected": classes_detected,
+                "qr_crops_saved": sum(1 for crop_info in qr_crops_info if crop_info.get("saved")),
                 "qr_codes_decoded": len([qr for qr in direct_qr_codes if qr.get("content")])
             }
         }
         
         if return_visualization:
-            vis_image = self.detector.visualize_detections(
-                original_image, original_detections, show_confidence=True
-            )
             result["visualization"] = vis_image
         
-        if self.save_processed_images:
-            processed_image_path = self._save_processed_image(
-                original_image, original_detections, image_source
-            )
+        if processed_image_save is not None:
+            processed_image_path, save_future = processed_image_save
             result["processed_image"] = {
-                "saved": True,
+                "saved": save_future.result(),
                 "path": processed_image_path,
                 "filename": os.path.basename(processed_image_path)
             }
@@ -174,16 +205,24 @@ class VisionProcessor:
         self, 
         original_image: np.ndarray, 
         detections: Dict, 
-        image_source: str
-    ) -> str:
-        vis_image = self.detector.visualize_detections(
-            original_image, detections, show_confidence=True
-        )
+        image_source: str,
+        now: Optional[datetime] = None,
+        vis_image_cached: Optional[np.ndarray] = None
+    ) -> Tuple[str, Future]:
+        vis_image = vis_image_cached
+        if vis_image is None:
+            vis_image = self.detector.visualize_detections(
+                original_image, detections, show_confidence=True
+            )
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        now = now or datetime.now()
+        timestamp = (
+            f"{now.year:04d}{now.month:02d}{now.day:02d}_"
+            f"{now.hour:02d}{now.minute:02d}{now.second:02d}_{now.microsecond // 1000:03d}"
+        )
         
         if isinstance(image_source, str) and image_source != "array":
-            base_name = Path(image_source).stem
+            base_name = os.path.splitext(os.path.basename(image_source))[0]
             filename = f"{base_name}_processed_{timestamp}.jpg"
         else:
             filename = f"processed_image_{timestamp}.jpg"
@@ -191,28 +230,30 @@ class VisionProcessor:
         output_path = os.path.join(self.processed_images_dir, filename)
         
         vis_image_bgr = cv2.cvtColor(vis_image, cv2.COLOR_RGB2BGR)
-        cv2.imwrite(output_path, vis_image_bgr)
-        
-        return output_path
+        return output_path, self._io_pool.submit(write_image, output_path, vis_image_bgr)
+    
+    def close(self):
+        """Aguarda a conclusão das escritas pendentes em disco e libera o pool de I/O."""
+        self._io_pool.shutdown(wait=True)
     
-    def _format_objects(self, detected_objects: List[Dict]) -> List[Dict]:
-        formatted_objects = []
+    def _finalize_objects(self, detected_objects: List[Dict], height: int, width: int) -> List[Dict]:
+        """
+        Valida as coordenadas, pelo mesmo caminho vetorizado dos QR codes, e formata os objetos detectados.
         
-        for obj in detected_objects:
-            formatted_obj = {
+        O bounding box corrigido também é gravado no objeto original, que segue
+        sendo usado pela visualização.
+        """
+        validate_coordinates_batch(detected_objects, (height, width))
+        
+        return [
+            {
                 "object_id": obj["object_id"],
                 "class": obj["class"],
                 "confidence": round(obj["confidence"], 3),
-                "bounding_box": {
-                    "x": obj["bounding_box"]["x"],
-                    "y": obj["bounding_box"]["y"],
-                    "width": obj["bounding_box"]["width"],
-                    "height": obj["bounding_box"]["height"]
-                }
+                "bounding_box": dict(obj["bounding_box"])
             }
-            formatted_objects.append(formatted_obj)
-        
-        return formatted_objects
+            for obj in detected_objects
+        ]
     
     def _format_qr_codes(
         self, 
@@ -220,94 +261,107 @@ class VisionProcessor:
         qr_crops_info: List[Dict],
         direct_qr_codes: List[Dict] = None
     ) -> List[Dict]:
-        formatted_qr_codes = []
-        
         crops_map = {crop["qr_id"]: crop for crop in qr_crops_info}
+        direct_qr_map = {
+            (direct_qr["bounding_box"]["x"], direct_qr["bounding_box"]["y"]): direct_qr
+            for direct_qr in direct_qr_codes or []
+        }
         
-        direct_qr_map = {}
-        if direct_qr_codes:
-            for direct_qr in direct_qr_codes:
-                bbox = direct_qr["bounding_box"]
-                key = f"{bbox['x']}_{bbox['y']}"
-                direct_qr_map[key] = direct_qr
+        return [
+            self._format_qr_code(qr, crops_map, direct_qr_map)
+            for qr in qr_detections
+        ]
+    
+    def _format_qr_code(
+        self,
+        qr: Dict,
+        crops_map: Dict[str, Dict],
+        direct_qr_map: Dict[tuple, Dict]
+    ) -> Dict:
+        qr_id = qr["qr_id"]
+        crop_info = crops_map.get(qr_id, {})
+        bbox = qr["bounding_box"]
+        
+        direct_qr = direct_qr_map.get((bbox["x"], bbox["y"]))
+        
+        qr_content = "PENDING_SCAN"
+        decode_source = "none"
+        
+        if crop_info.get("decoded_content"):
+            qr_content = crop_info["decoded_content"]
+            decode_source = "crop"
+        elif direct_qr and direct_qr.get("content"):
+            qr_content = direct_qr["content"]
+            decode_source = "direct"
+        
+        formatted_qr = {
+            "qr_id": qr_id,
+            "content": qr_content,
+            "decode_source": decode_source,
+            "position": {
+                "x": bbox["x"],
+                "y": bbox["y"]
+            },
+            "confidence": round(qr["confidence"], 3),
+            "bounding_box": {
+                "x": bbox["x"],
+                "y": bbox["y"],
+                "width": bbox["width"],
+                "height": bbox["height"]
+            }
+        }
         
-        for qr in qr_detections:
-            qr_id = qr["qr_id"]
-            crop_info = crops_map.get(qr_id, {})
-            
-            bbox_key = f"{qr['bounding_box']['x']}_{qr['bounding_box']['y']}"
-            direct_qr = direct_qr_map.get(bbox_key)
-            
-            qr_content = "PENDING_SCAN"
-            decode_source = "none"
-            
-            if crop_info.get("decoded_content"):
-                qr_content = crop_info["decoded_content"]
-                decode_source = "crop"
-            elif direct_qr and direct_qr.get("content"):
-                qr_content = direct_qr["content"]
-                decode_source = "direct"
-            
-            formatted_qr = {
-                "qr_id": qr_id,
-                "content": qr_content,
-                "decode_source": decode_source,
-                "position": {
-                    "x": qr["bounding_box"]["x"],
-                    "y": qr["bounding_box"]["y"]
-                },
-                "confidence": round(qr["confidence"], 3),
-                "bounding_box": {
-                    "x": qr["bounding_box"]["x"],
-                    "y": qr["bounding_box"]["y"],
-                    "width": qr["bounding_box"]["width"],
-                    "height": qr["bounding_box"]["height"]
-                }
+        if crop_info:
+            formatted_qr["crop_info"] = {
+                "saved": crop_info.get("saved", False),
+                "path": crop_info.get("saved_path", ""),
+                "size": crop_info.get("size", {}),
+                "decode_success": qr_content not in ("PENDING_SCAN", "DECODE_FAILED")
             }
-            
-            if crop_info:
-                formatted_qr["crop_info"] = {
-                    "saved": True,
-                    "path": crop_info.get("saved_path", ""),
-                    "size": crop_info.get("size", {}),
-                    "decode_success": qr_content not in ["PENDING_SCAN", "DECODE_FAILED"]
-                }
-            else:
-                formatted_qr["crop_info"] = {"saved": False}
-            
-            formatted_qr_codes.append(formatted_qr)
+        else:
+            formatted_qr["crop_info"] = {"saved": False}
         
-        return formatted_qr_codes
+        return formatted_qr
     
     def process_batch(
         self,
         image_paths: List[str],
         save_qr_crops: bool = True
     ) -> List[Dict]:
-        results = []
-        
-        for i, image_path in enumerate(image_paths):
-            try:
-                result = self.process_image(image_path, save_qr_crops)
-                result["batch_info"] = {
+        total = len(image_paths)
+        if total == 0:
+            return []
+        
+        results = [None] * total
+        max_workers = min(self.batch_workers, total)
+        
+        # Decodificação, pré-processamento e QR liberam o GIL; a inferência YOLO
+        # é serializada dentro do próprio detector.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.process_image, image_path, save_qr_crops): (i, image_path)
+                for i, image_path in enumerate(image_paths)
+            }
+            
+            for future in as_completed(futures):
+                i, image_path = futures[future]
+                batch_info = {
                     "index": i,
-                    "total": len(image_paths),
+                    "total": total,
                     "image_path": image_path
                 }
-                results.append(result)
-                
-            except Exception as e:
-                error_result = {
-                    "error": str(e),
-                    "image_path": image_path,
-                    "batch_info": {
-                        "index": i,
-                        "total": len(image_paths),
-                        "image_path": image_path
+                try:
+                    result = future.result()
+                    result["batch_info"] = batch_info
+                except Exception as e:
+                    result = {
+                        "error": str(e),
+                        "image_path": image_path,
+                        "batch_info": batch_info
                     }
-                }
-                results.append(error_result)
-                logger.error(f"Erro ao processar {os.path.basename(image_path)}: {e}")
+                    logger.error(f"Erro ao processar {os.path.basename(image_path)}: {e}")
+                
+                results[i] = result
         
         return results
     
@@ -323,8 +377,8 @@ class VisionProcessor:
             "classes_summary": {}
         }
         
-        processing_times = []
-        all_classes = []
+        total_time = 0
+        class_counter = Counter()
         
         for result in results:
             if "error" in result:
@@ -336,14 +390,13 @@ class VisionProcessor:
             stats["total_qr_codes_detected"] += result["summary"]["qr_codes_count"]
             stats["total_qr_crops_saved"] += result["summary"]["qr_crops_saved"]
             
-            processing_times.append(result["scan_metadata"]["processing_time_ms"])
-            all_classes.extend(result["summary"]["classes_detected"])
+            total_time += result["scan_metadata"]["processing_time_ms"]
+            class_counter.update(result["summary"]["classes_detected"])
         
-        if processing_times:
-            stats["average_processing_time_ms"] = sum(processing_times) / len(processing_times)
+        if stats["successful_processing"]:
+            stats["average_processing_time_ms"] = total_time / stats["successful_processing"]
         
-        class_counts = Counter(all_classes)
-        stats["classes_summary"] = dict(class_counts)
+        stats["classes_summary"] = dict(class_counter)
         
         return stats
 
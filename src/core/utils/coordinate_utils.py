@@ -3,22 +3,15 @@ Utilitários para conversão de coordenadas entre imagens originais e processada
 """
 
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 
-def convert_coordinates_to_original(
-    bbox: Dict,
-    preprocessing_metadata: Dict
-) -> Dict:
+def _conversion_params(preprocessing_metadata: Dict) -> Tuple:
     """
-    Converte coordenadas de bounding box da imagem processada para a imagem original.
+    Calcula, uma única vez por metadado, os parâmetros da conversão para a imagem original.
     
-    Args:
-        bbox: Bounding box com coordenadas da imagem processada
-        preprocessing_metadata: Metadados do pré-processamento contendo scale_factor e offsets
-        
     Returns:
-        Bounding box com coordenadas convertidas para a imagem original
+        Tupla (scale_factor, x_offset, y_offset, new_w, new_h, orig_w, orig_h)
     """
     scale_factor = preprocessing_metadata.get("scale_factor", 1.0)
     target_size = preprocessing_metadata.get("target_size", (640, 640))
@@ -33,6 +26,26 @@ def convert_coordinates_to_original(
     x_offset = (target_w - new_w) // 2
     y_offset = (target_h - new_h) // 2
     
+    return scale_factor, x_offset, y_offset, new_w, new_h, orig_w, orig_h
+
+
+def convert_coordinates_to_original(
+    bbox: Dict,
+    preprocessing_metadata: Dict
+) -> Dict:
+    """
+    Converte coordenadas de bounding box da imagem processada para a imagem original.
+    
+    Args:
+        bbox: Bounding box com coordenadas da imagem processada
+        preprocessing_metadata: Metadados do pré-processamento contendo scale_factor e offsets
+        
+    Returns:
+        Bounding box com coordenadas convertidas para a imagem original
+    """
+    (scale_factor, x_offset, y_offset,
+     new_w, new_h, orig_w, orig_h) = _conversion_params(preprocessing_metadata)
+    
     # Coordenadas da imagem processada
     x_proc = bbox["x"]
     y_proc = bbox["y"]
@@ -90,22 +103,59 @@ def convert_detections_to_original(
         Detecções com coordenadas convertidas
     """
     converted_detections = detections.copy()
+    params = _conversion_params(preprocessing_metadata)
     
-    # Converte coordenadas dos objetos detectados
-    for obj in converted_detections["detected_objects"]:
-        obj["bounding_box"] = convert_coordinates_to_original(
-            obj["bounding_box"], preprocessing_metadata
-        )
-    
-    # Converte coordenadas dos QR codes
-    for qr in converted_detections["qr_codes"]:
-        qr["bounding_box"] = convert_coordinates_to_original(
-            qr["bounding_box"], preprocessing_metadata
-        )
+    # Objetos e QR codes compartilham um único array (N, 4) e uma única passada vetorizada
+    _convert_bboxes_to_original(
+        converted_detections["detected_objects"] + converted_detections["qr_codes"],
+        params
+    )
     
     return converted_detections
 
 
+def _convert_bboxes_to_original(items: List[Dict], params: Tuple) -> None:
+    """
+    Versão vetorizada de convert_coordinates_to_original para uma lista de detecções.
+    
+    Aplica exatamente as mesmas regras (offsets, clamps e truncamento) sobre um
+    array (N, 4) e substitui o "bounding_box" de cada item. Recebe os parâmetros
+    já calculados por _conversion_params.
+    """
+    if not items:
+        return
+    
+    (scale_factor, x_offset, y_offset,
+     new_w, new_h, orig_w, orig_h) = params
+    
+    boxes = np.array(
+        [[b["x"], b["y"], b["width"], b["height"]] for b in (item["bounding_box"] for item in items)],
+        dtype=np.float64
+    )
+    
+    # Todas as etapas operam in-place sobre o mesmo array, sem temporários por etapa
+    xy = boxes[:, :2]
+    wh = boxes[:, 2:]
+    
+    # Remove os offsets e limita à região válida da imagem redimensionada
+    xy -= (x_offset, y_offset)
+    np.clip(xy, 0, (new_w, new_h), out=xy)
+    wh += xy
+    np.minimum(wh, (new_w, new_h), out=wh)
+    wh -= xy
+    
+    # Volta para a escala original (int() trunca em direção a zero)
+    boxes /= scale_factor
+    np.trunc(boxes, out=boxes)
+    
+    np.clip(xy, 0, (orig_w, orig_h), out=xy)
+    np.minimum(wh, (orig_w, orig_h) - xy, out=wh)
+    
+    converted = boxes.astype(np.int64).tolist()
+    for item, (x, y, w, h) in zip(items, converted):
+        item["bounding_box"] = {"x": x, "y": y, "width": w, "height": h}
+
+
 def validate_coordinates(
     bbox: Dict,
     image_shape: Tuple[int, int]
@@ -122,21 +172,61 @@ def validate_coordinates(
     """
     height, width = image_shape
     
-    x = max(0, min(bbox["x"], width - 1))
-    y = max(0, min(bbox["y"], height - 1))
+    x = max(0, min(width - 1, int(bbox["x"])))
+    y = max(0, min(height - 1, int(bbox["y"])))
+    
+    return {
+        "x": x,
+        "y": y,
+        "width": max(1, min(width - x, int(bbox["width"]))),
+        "height": max(1, min(height - y, int(bbox["height"])))
+    }
+
+
+def _validate_batch(xywh: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    Limita, no próprio array, bounding boxes (N, 4) no formato x, y, largura, altura.
+    
+    Args:
+        xywh: Array inteiro (N, 4) modificado in-place
+        height: Altura da imagem
+        width: Largura da imagem
+        
+    Returns:
+        O mesmo array recebido, já corrigido
+    """
+    np.clip(xywh[:, 0], 0, width - 1, out=xywh[:, 0])
+    np.clip(xywh[:, 1], 0, height - 1, out=xywh[:, 1])
+    np.clip(xywh[:, 2], 1, width - xywh[:, 0], out=xywh[:, 2])
+    np.clip(xywh[:, 3], 1, height - xywh[:, 1], out=xywh[:, 3])
+    return xywh
 
-    max_width = width - x
-    max_height = height - y
+
+def validate_coordinates_batch(
+    items: List[Dict],
+    image_shape: Tuple[int, int]
+) -> None:
+    """
+    Valida e corrige, de forma vetorizada, os bounding boxes de uma lista de detecções.
+    
+    Equivalente a aplicar validate_coordinates em cada item, mas com um único
+    np.clip por coordenada. Os bounding boxes são substituídos no próprio item.
+    
+    Args:
+        items: Detecções contendo a chave "bounding_box"
+        image_shape: Formato da imagem (height, width)
+    """
+    if not items:
+        return
     
-    width_bbox = min(bbox["width"], max_width)
-    height_bbox = min(bbox["height"], max_height)
+    height, width = image_shape
     
-    width_bbox = max(1, width_bbox)
-    height_bbox = max(1, height_bbox)
+    boxes = np.array(
+        [[b["x"], b["y"], b["width"], b["height"]] for b in (item["bounding_box"] for item in items)],
+        dtype=np.int32
+    )
     
-    return {
-        "x": int(x),
-        "y": int(y),
-        "width": int(width_bbox),
-        "height": int(height_bbox)
-    }
+    _validate_batch(boxes, height, width)
+    
+    for item, (x, y, w, h) in zip(items, boxes.tolist()):
+        item["bounding_box"] = {"x": x, "y": y, "width": w, "height": h}
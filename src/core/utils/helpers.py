@@ -2,38 +2,86 @@
 Utilitários e funções auxiliares para o sistema de visão computacional.
 """
 
-import json
 import os
+import cv2
+import numpy as np
+import orjson
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Dict, List
 
+from ..config import SUPPORTED_IMAGE_EXTENSIONS
 from ..logging_config import get_logger
 
 logger = get_logger(__name__)
 
+_SUBDIRECTORIES = ("qr_crops", "outputs", "temp", "logs")
+_IMAGE_EXTENSIONS = frozenset(SUPPORTED_IMAGE_EXTENSIONS)
+
+
+def write_image(path: str, image: np.ndarray) -> bool:
+    """
+    Grava a imagem em disco e registra no log quando a escrita falha.
+    
+    Não levanta exceções, para poder rodar no pool de I/O; o retorno indica
+    se o arquivo foi efetivamente gravado.
+    """
+    try:
+        if cv2.imwrite(path, image):
+            return True
+        logger.error(f"Falha ao gravar imagem: {path}")
+    except Exception as e:
+        logger.error(f"Erro ao gravar imagem {path}: {e}")
+    return False
+
+
+def _serialize_dict(obj: Dict) -> Dict:
+    return {key: make_json_serializable(value) for key, value in obj.items()}
+
+
+def _serialize_sequence(obj: Any) -> List:
+    return [make_json_serializable(item) for item in obj]
+
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+
+_JSON_CONVERTERS = {
+    np.ndarray: np.ndarray.tolist,
+    dict: _serialize_dict,
+    list: _serialize_sequence,
+    tuple: _serialize_sequence,
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): _identity,
+}
+
 
 def make_json_serializable(obj: Any) -> Any:
-    import numpy as np
+    converter = _JSON_CONVERTERS.get(type(obj))
+    if converter is not None:
+        return converter(obj)
     
-    if isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, np.integer):
+    if isinstance(obj, np.integer):
         return int(obj)
     elif isinstance(obj, np.floating):
         return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
     elif isinstance(obj, dict):
-        return {key: make_json_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [make_json_serializable(item) for item in obj]
+        return _serialize_dict(obj)
+    elif isinstance(obj, (list, tuple)):
+        return _serialize_sequence(obj)
     else:
         return obj
 
 
 def load_results_from_json(file_path: str) -> Dict:
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
     except Exception as e:
         logger.error(f"Erro ao carregar JSON: {e}")
         return {}
@@ -51,43 +99,34 @@ def create_output_directory(base_dir: str, timestamp: bool = True) -> str:
 
 
 def validate_image_path(image_path: str) -> bool:
-    if not os.path.exists(image_path):
+    # A extensão é verificada antes de qualquer acesso ao sistema de arquivos
+    dot = image_path.rfind('.')
+    if dot < 0 or image_path[dot:].lower() not in _IMAGE_EXTENSIONS:
         return False
     
-    valid_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
-    file_extension = Path(image_path).suffix.lower()
-    
-    return file_extension in valid_extensions
+    return os.path.exists(image_path)
 
 
 def get_image_files_from_directory(directory: str, recursive: bool = False) -> List[str]:
-    valid_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
     image_files = []
+    pending = [directory]
     
-    if recursive:
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if Path(file).suffix.lower() in valid_extensions:
-                    image_files.append(os.path.join(root, file))
-    else:
-        for file in os.listdir(directory):
-            file_path = os.path.join(directory, file)
-            if os.path.isfile(file_path) and Path(file).suffix.lower() in valid_extensions:
-                image_files.append(file_path)
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in _IMAGE_EXTENSIONS and entry.is_file():
+                    image_files.append(entry.path)
     
     return sorted(image_files)
 
+
 def create_directory_structure(base_path: str) -> Dict[str, str]:
-    directories = {
-        "qr_crops": os.path.join(base_path, "qr_crops"),
-        "outputs": os.path.join(base_path, "outputs"),
-        "temp": os.path.join(base_path, "temp"),
-        "logs": os.path.join(base_path, "logs")
-    }
+    directories = {name: os.path.join(base_path, name) for name in _SUBDIRECTORIES}
     
-    for name, path in directories.items():
+    for path in directories.values():
         os.makedirs(path, exist_ok=True)
     
     return directories
-
-
@@ -0,0 +1,27 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.alter_column(
+        'vision_results',
+        'result',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='result::jsonb',
+    )
+
+def downgrade():
+    op.alter_column(
+        'vision_results',
+        'result',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='result::json',
+    )
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, Integer, DateTime, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from .database import Base
 import uuid
 from datetime import datetime
@@ -10,7 +11,7 @@ class VisionResult(Base):
     status = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime)
-    result = Column(JSON)
+    result = Column(JSON().with_variant(JSONB(), "postgresql"))
 
 class VisionTask(Base):
     __tablename__ = "vision_tasks"
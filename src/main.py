@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .api.routes import image_routes
 
@@ -8,7 +9,8 @@ app = FastAPI(
     description="API para processamento assíncrono de imagens com detecção de objetos e QR codes usando YOLO",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -16,6 +16,7 @@ from .base import TaskStatus, Position, BoundingBox, BaseTimestampedModel, BaseT
 # Importações dos modelos de visão
 from .vision import (
     ObjectClass,
+    ObjectClassLiteral,
     DetectedObject,
     QRCode,
     ScanMetadata,
@@ -51,6 +52,7 @@ __all__ = [
     
     # Vision
     "ObjectClass",
+    "ObjectClassLiteral",
     "DetectedObject",
     "QRCode", 
     "ScanMetadata",
@@ -7,6 +7,12 @@ from .base import TaskStatus, BaseTaskModel
 from .vision import VisionProcessingResult
 
 
+_ALLOWED_IMAGE_CONTENT_TYPES = frozenset((
+    "image/jpeg", "image/jpg", "image/png",
+    "image/bmp", "image/tiff", "image/webp"
+))
+
+
 class ImageUploadResponse(BaseModel):
     task_id: str = Field(..., description="ID da tarefa criada")
     status: str = Field(..., description="Status inicial")
@@ -76,11 +82,7 @@ class ImageUploadRequest(BaseModel):
     
     @validator("content_type")
     def validate_content_type(cls, v):
-        allowed_types = {
-            "image/jpeg", "image/jpg", "image/png", 
-            "image/bmp", "image/tiff", "image/webp"
-        }
-        if v not in allowed_types:
+        if v not in _ALLOWED_IMAGE_CONTENT_TYPES:
             raise ValueError(f"Tipo de arquivo não suportado: {v}")
         return v
 
@@ -1,8 +1,8 @@
 
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 
 from .base import Position, BoundingBox
 
@@ -14,27 +14,42 @@ class ObjectClass(str, Enum):
     FORKLIFT = "forklift"
 
 
+# Mesmo domínio do ObjectClass como strings simples; usado nos modelos para que
+# comparações e validação não passem pelo Enum.
+ObjectClassLiteral = Literal["box", "qr_code", "pallet", "forklift"]
+
+
 class DetectedObject(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, frozen=True, extra="forbid")
+    
     object_id: str = Field(..., description="Identificador único do objeto")
-    class_name: ObjectClass = Field(..., alias="class", description="Classe do objeto detectado")
+    class_name: ObjectClassLiteral = Field(..., alias="class", description="Classe do objeto detectado")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confiança da detecção")
     bounding_box: BoundingBox = Field(..., description="Caixa delimitadora do objeto")
+
+
+class CropSize(BaseModel):
+    model_config = ConfigDict(frozen=True)
     
-    class Config:
-        allow_population_by_field_name = True
+    width: int = Field(..., ge=0, description="Largura do recorte")
+    height: int = Field(..., ge=0, description="Altura do recorte")
 
 
 class CropInfo(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     saved: bool = Field(..., description="Se o recorte foi salvo")
     path: Optional[str] = Field(None, description="Caminho do arquivo do recorte")
-    size: Optional[Dict[str, int]] = Field(None, description="Dimensões do recorte")
+    size: Optional[CropSize] = Field(None, description="Dimensões do recorte")
     decode_success: Optional[bool] = Field(None, description="Se a decodificação foi bem-sucedida")
 
 
 class QRCode(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     qr_id: str = Field(..., description="Identificador único do QR code")
     content: str = Field(..., description="Conteúdo decodificado do QR code")
-    decode_source: str = Field(
+    decode_source: Literal["crop", "direct", "none"] = Field(
         ..., 
         description="Fonte da decodificação (crop, direct, none)"
     )
@@ -42,16 +57,12 @@ class QRCode(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confiança da detecção")
     bounding_box: BoundingBox = Field(..., description="Caixa delimitadora do QR code")
     crop_info: CropInfo = Field(..., description="Informações sobre o recorte")
-    
-    @validator("decode_source")
-    def validate_decode_source(cls, v):
-        allowed_sources = {"crop", "direct", "none"}
-        if v not in allowed_sources:
-            raise ValueError(f"decode_source deve ser um dos: {allowed_sources}")
-        return v
 
 
 class PreprocessingInfo(BaseModel):
+    # Os metadados do pré-processamento trazem chaves extras que são descartadas
+    model_config = ConfigDict(frozen=True)
+    
     scale_factor: Optional[float] = Field(None, description="Fator de escala aplicado")
     x_offset: Optional[int] = Field(None, description="Offset horizontal")
     y_offset: Optional[int] = Field(None, description="Offset vertical")
@@ -60,6 +71,8 @@ class PreprocessingInfo(BaseModel):
 
 
 class ScanMetadata(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     timestamp: str = Field(..., description="Timestamp do processamento (ISO format)")
     image_resolution: str = Field(..., description="Resolução da imagem processada")
     processing_time_ms: int = Field(..., ge=0, description="Tempo de processamento em milissegundos")
@@ -68,6 +81,8 @@ class ScanMetadata(BaseModel):
 
 
 class ProcessingSummary(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     total_detections: int = Field(..., ge=0, description="Total de detecções")
     objects_count: int = Field(..., ge=0, description="Número de objetos detectados")
     qr_codes_count: int = Field(..., ge=0, description="Número de QR codes detectados")
@@ -77,12 +92,16 @@ class ProcessingSummary(BaseModel):
 
 
 class ProcessedImageInfo(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
     saved: bool = Field(..., description="Se a imagem foi salva")
     path: Optional[str] = Field(None, description="Caminho da imagem salva")
     filename: Optional[str] = Field(None, description="Nome do arquivo salvo")
 
 
 class VisionProcessingResult(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
     scan_metadata: ScanMetadata = Field(..., description="Metadados do escaneamento")
     detected_objects: List[DetectedObject] = Field(
         default_factory=list,
@@ -101,11 +120,3 @@ class VisionProcessingResult(BaseModel):
         None,
         description="Se o arquivo fonte foi removido após processamento"
     )
-    visualization: Optional[Any] = Field(
-        None,
-        description="Imagem de visualização com detecções (array numpy)"
-    )
-    
-    class Config:
-        extra = "allow"
-        arbitrary_types_allowed = True
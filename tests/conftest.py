@@ -2,9 +2,11 @@ import pytest
 import os
 import sys
 import tempfile
+import numpy as np
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from src.db.database import Base
 
 project_root = Path(__file__).parent.parent
@@ -22,9 +24,29 @@ def setup_test_environment():
     if "TESTING" in os.environ:
         del os.environ["TESTING"]
 
+@pytest.fixture(scope="session", autouse=True)
+def seed_numpy_rng():
+    # Semente fixa por processo (inclusive em cada worker do xdist) para reproduzir falhas
+    np.random.seed(0)
+
 @pytest.fixture(scope="session")
 def test_db_engine():
-    engine = create_engine("sqlite:///:memory:", echo=False)
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        echo=False
+    )
+    
+    # pysqlite não emite BEGIN sozinho; sem isso os SAVEPOINTs por teste não isolam nada
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+    
     Base.metadata.create_all(engine)
     yield engine
     engine.dispose()
@@ -34,7 +56,7 @@ def test_db_session(test_db_engine):
     connection = test_db_engine.connect()
     transaction = connection.begin()
     
-    TestSession = sessionmaker(bind=connection)
+    TestSession = sessionmaker(bind=connection, join_transaction_mode="create_savepoint")
     session = TestSession()
     
     yield session
@@ -1,14 +1,23 @@
+import orjson
 import pytest
+from io import BytesIO
 from unittest.mock import patch
+from fastapi import Response
 from fastapi.testclient import TestClient
 from src.main import app
 
 
+# Serializada uma única vez. Só rotas sem response_model recebem bytes prontos;
+# as demais recebem dicts para que a validação do response_model seja exercitada.
+MOCK_HEALTH = orjson.dumps({"status": "healthy", "services": {"redis": "ok", "postgres": "ok"}})
+
+
 class TestAPIRoutes:
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def client(self):
-        return TestClient(app)
+        with TestClient(app) as test_client:
+            yield test_client
 
     def test_root_endpoint(self, client):
         response = client.get("/")
@@ -21,7 +30,7 @@ class TestAPIRoutes:
 
     def test_health_endpoint(self, client):
         with patch('src.api.controllers.image_controller.image_controller.health_check') as mock_health:
-            mock_health.return_value = {"status": "healthy", "services": {"redis": "ok", "postgres": "ok"}}
+            mock_health.return_value = Response(MOCK_HEALTH, media_type="application/json")
             
             response = client.get("/api/v1/health")
             
@@ -37,14 +46,10 @@ class TestAPIRoutes:
             "message": "Imagem enviada para processamento"
         }
         
-        with open("/tmp/test_image.jpg", "wb") as f:
-            f.write(b"fake image data")
-        
-        with open("/tmp/test_image.jpg", "rb") as f:
-            response = client.post(
-                "/api/v1/images/upload",
-                files={"file": ("test_image.jpg", f, "image/jpeg")}
-            )
+        response = client.post(
+            "/api/v1/images/upload",
+            files={"file": ("test_image.jpg", BytesIO(b"fake image data"), "image/jpeg")}
+        )
         
         assert response.status_code == 200
         data = response.json()
@@ -58,14 +63,10 @@ class TestAPIRoutes:
             {"task_id": "task-2", "status": "processing", "message": "Image uploaded successfully"}
         ]
         
-        for i in range(2):
-            with open(f"/tmp/test_image_{i}.jpg", "wb") as f:
-                f.write(f"fake image data {i}".encode())
-        
-        files = []
-        for i in range(2):
-            with open(f"/tmp/test_image_{i}.jpg", "rb") as f:
-                files.append(("files", (f"test_image_{i}.jpg", f.read(), "image/jpeg")))
+        files = [
+            ("files", (f"test_image_{i}.jpg", BytesIO(f"fake image data {i}".encode()), "image/jpeg"))
+            for i in range(2)
+        ]
         
         response = client.post("/api/v1/images/upload-multiple", files=files)
         
@@ -135,17 +136,14 @@ class TestAPIRoutes:
             response = client.get("/api/v1/results?status=completed&page=1&limit=10")
             
             assert response.status_code == 200
+            assert response.json() == {"tasks": [], "total": 0, "page": 1, "limit": 10}
             mock_list.assert_called_once()
 
     def test_upload_invalid_file(self, client):
-        with open("/tmp/test.txt", "w") as f:
-            f.write("not an image")
-        
-        with open("/tmp/test.txt", "rb") as f:
-            response = client.post(
-                "/api/v1/images/upload",
-                files={"file": ("test.txt", f, "text/plain")}
-            )
+        response = client.post(
+            "/api/v1/images/upload",
+            files={"file": ("test.txt", BytesIO(b"not an image"), "text/plain")}
+        )
         
         assert response.status_code in [400, 422]
 
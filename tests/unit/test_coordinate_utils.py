@@ -4,70 +4,58 @@ import numpy as np
 from src.core.utils.coordinate_utils import (
     convert_coordinates_to_original,
     convert_detections_to_original,
-    validate_coordinates
+    validate_coordinates,
+    validate_coordinates_batch
 )
 
 
 class TestConvertCoordinatesToOriginal:
     
-    def test_no_scaling_no_offset(self):
-        bbox = {"x": 100, "y": 50, "width": 200, "height": 150}
-        metadata = {
-            "scale_factor": 1.0,
-            "target_size": (640, 640),
-            "original_shape": (640, 640)
-        }
-        
-        result = convert_coordinates_to_original(bbox, metadata)
-        
-        assert result["x"] == 100
-        assert result["y"] == 50
-        assert result["width"] == 200
-        assert result["height"] == 150
-    
-    def test_scaling_down(self):
-        bbox = {"x": 320, "y": 160, "width": 100, "height": 80}
-        metadata = {
-            "scale_factor": 0.5,
-            "target_size": (640, 640),
-            "original_shape": (1280, 1280)
-        }
-        
-        result = convert_coordinates_to_original(bbox, metadata)
-        
-        assert result["x"] == 640
-        assert result["y"] == 320
-        assert result["width"] == 200
-        assert result["height"] == 160
-    
-    def test_scaling_up(self):
-        bbox = {"x": 100, "y": 100, "width": 50, "height": 50}
-        metadata = {
-            "scale_factor": 2.0,
-            "target_size": (640, 640),
-            "original_shape": (320, 320)
-        }
-        
-        result = convert_coordinates_to_original(bbox, metadata)
-        assert result["x"] == 50
-        assert result["y"] == 50
-        assert result["width"] == 25
-        assert result["height"] == 25
-    
-    def test_with_offsets(self):
-        bbox = {"x": 170, "y": 120, "width": 100, "height": 80}
-        metadata = {
-            "scale_factor": 1.0,
-            "target_size": (640, 640),
-            "original_shape": (300, 400)  
-        }
-        
+    @pytest.mark.parametrize("bbox,metadata,expected", [
+        pytest.param(
+            {"x": 100, "y": 50, "width": 200, "height": 150},
+            {"scale_factor": 1.0, "target_size": (640, 640), "original_shape": (640, 640)},
+            {"x": 100, "y": 50, "width": 200, "height": 150},
+            id="no_scaling_no_offset"
+        ),
+        pytest.param(
+            {"x": 320, "y": 160, "width": 100, "height": 80},
+            {"scale_factor": 0.5, "target_size": (640, 640), "original_shape": (1280, 1280)},
+            {"x": 640, "y": 320, "width": 200, "height": 160},
+            id="scaling_down"
+        ),
+        pytest.param(
+            {"x": 100, "y": 100, "width": 50, "height": 50},
+            {"scale_factor": 2.0, "target_size": (640, 640), "original_shape": (320, 320)},
+            {"x": 50, "y": 50, "width": 25, "height": 25},
+            id="scaling_up"
+        ),
         # Offsets esperados: x_offset = (640-400)//2 = 120, y_offset = (640-300)//2 = 170
+        # Remove offsets: x = 170-120 = 50, y = 120-170 = -50 (clamped to 0)
+        pytest.param(
+            {"x": 170, "y": 120, "width": 100, "height": 80},
+            {"scale_factor": 1.0, "target_size": (640, 640), "original_shape": (300, 400)},
+            {"x": 50, "y": 0},
+            id="with_offsets"
+        ),
+        pytest.param(
+            {"x": 0, "y": 0, "width": 50, "height": 50},
+            {"scale_factor": 0.5, "target_size": (640, 640), "original_shape": (1280, 1280)},
+            {"x": 0, "y": 0, "width": 100, "height": 100},
+            id="zero_coordinates"
+        ),
+        pytest.param(
+            {"x": 100, "y": 100, "width": 50, "height": 50},
+            {},
+            {"x": 100, "y": 100, "width": 50, "height": 50},
+            id="default_values"
+        ),
+    ])
+    def test_conversion(self, bbox, metadata, expected):
         result = convert_coordinates_to_original(bbox, metadata)
         
-        # Remove offsets: x = 170-120 = 50, y = 120-170 = -50 (clamped to 0)
-        assert result["x"] == 50
-        assert result["y"] == 0
+        for key, value in expected.items():
+            assert result[key] == value
     
     def test_coordinates_clamping(self):
         bbox = {"x": 600, "y": 600, "width": 100, "height": 100}
@@ -83,32 +71,6 @@ class TestConvertCoordinatesToOriginal:
         assert result["y"] <= 500
         assert result["width"] <= 500 - result["x"]
         assert result["height"] <= 500 - result["y"]
-    
-    def test_zero_coordinates(self):
-        bbox = {"x": 0, "y": 0, "width": 50, "height": 50}
-        metadata = {
-            "scale_factor": 0.5,
-            "target_size": (640, 640),
-            "original_shape": (1280, 1280)
-        }
-        
-        result = convert_coordinates_to_original(bbox, metadata)
-        
-        assert result["x"] == 0
-        assert result["y"] == 0
-        assert result["width"] == 100
-        assert result["height"] == 100
-    
-    def test_default_values(self):
-        bbox = {"x": 100, "y": 100, "width": 50, "height": 50}
-        metadata = {}  
-        
-        result = convert_coordinates_to_original(bbox, metadata)
-        
-        assert result["x"] == 100
-        assert result["y"] == 100
-        assert result["width"] == 50
-        assert result["height"] == 50
 
 
 class TestConvertDetectionsToOriginal:
@@ -233,104 +195,105 @@ class TestConvertDetectionsToOriginal:
 
 class TestValidateCoordinates:
     
-    def test_valid_coordinates(self):
-        bbox = {"x": 100, "y": 50, "width": 200, "height": 150}
-        image_shape = (480, 640) 
-        result = validate_coordinates(bbox, image_shape)
-        
-        assert result["x"] == 100
-        assert result["y"] == 50
-        assert result["width"] == 200
-        assert result["height"] == 150
+    @pytest.mark.parametrize("bbox,image_shape,expected", [
+        pytest.param(
+            {"x": 100, "y": 50, "width": 200, "height": 150},
+            (480, 640),
+            {"x": 100, "y": 50, "width": 200, "height": 150},
+            id="valid_coordinates"
+        ),
+        pytest.param(
+            {"x": -10, "y": -5, "width": 100, "height": 80},
+            (480, 640),
+            {"x": 0, "y": 0, "width": 100, "height": 80},
+            id="negative_coordinates"
+        ),
+        pytest.param(
+            {"x": 700, "y": 500, "width": 100, "height": 80},
+            (480, 640),
+            {"x": 639, "y": 479, "width": 1, "height": 1},
+            id="coordinates_outside_image"
+        ),
+        pytest.param(
+            {"x": 500, "y": 400, "width": 200, "height": 150},
+            (480, 640),
+            {"x": 500, "y": 400, "width": 140, "height": 80},
+            id="width_height_exceeding_bounds"
+        ),
+        pytest.param(
+            {"x": 100, "y": 50, "width": 0, "height": 0},
+            (480, 640),
+            {"x": 100, "y": 50, "width": 1, "height": 1},
+            id="zero_width_height"
+        ),
+        pytest.param(
+            {"x": 100, "y": 50, "width": -50, "height": -30},
+            (480, 640),
+            {"x": 100, "y": 50, "width": 1, "height": 1},
+            id="negative_width_height"
+        ),
+        pytest.param(
+            {"x": 639, "y": 479, "width": 1, "height": 1},
+            (480, 640),
+            {"x": 639, "y": 479, "width": 1, "height": 1},
+            id="edge_coordinates"
+        ),
+        pytest.param(
+            {"x": 50, "y": 30, "width": 100, "height": 80},
+            (60, 80),
+            {"x": 50, "y": 30, "width": 30, "height": 30},
+            id="small_image"
+        ),
+    ])
+    def test_validation(self, bbox, image_shape, expected):
+        assert validate_coordinates(bbox, image_shape) == expected
     
-    def test_negative_coordinates(self):
-        bbox = {"x": -10, "y": -5, "width": 100, "height": 80}
+    def test_return_type_is_int(self):
+        bbox = {"x": 100.7, "y": 50.3, "width": 200.9, "height": 150.1}
         image_shape = (480, 640)
         
         result = validate_coordinates(bbox, image_shape)
         
-        assert result["x"] == 0
-        assert result["y"] == 0
-        assert result["width"] == 100
-        assert result["height"] == 80
-    
-    def test_coordinates_outside_image(self):
-        bbox = {"x": 700, "y": 500, "width": 100, "height": 80}
-        image_shape = (480, 640) 
-        result = validate_coordinates(bbox, image_shape)
-        
-        assert result["x"] == 639
-        assert result["y"] == 479
-        assert result["width"] == 1 
-        assert result["height"] == 1
-    
-    def test_width_height_exceeding_bounds(self):
-        bbox = {"x": 500, "y": 400, "width": 200, "height": 150}
-        image_shape = (480, 640)  
-        
-        result = validate_coordinates(bbox, image_shape)
-        
-        assert result["x"] == 500
-        assert result["y"] == 400
-        assert result["width"] == 140
-        assert result["height"] == 80
-    
-    def test_zero_width_height(self):
-        bbox = {"x": 100, "y": 50, "width": 0, "height": 0}
-        image_shape = (480, 640)
-        
-        result = validate_coordinates(bbox, image_shape)
+        assert isinstance(result["x"], int)
+        assert isinstance(result["y"], int)
+        assert isinstance(result["width"], int)
+        assert isinstance(result["height"], int)
         
         assert result["x"] == 100
         assert result["y"] == 50
-        assert result["width"] == 1
-        assert result["height"] == 1
+        assert result["width"] == 200
+        assert result["height"] == 150
+
+
+class TestValidateCoordinatesBatch:
     
-    def test_negative_width_height(self):
-        bbox = {"x": 100, "y": 50, "width": -50, "height": -30}
+    def test_matches_scalar_validation(self):
+        bboxes = [
+            {"x": 100, "y": 50, "width": 200, "height": 150},
+            {"x": -10, "y": -5, "width": 100, "height": 80},
+            {"x": 700, "y": 500, "width": 100, "height": 80},
+            {"x": 500, "y": 400, "width": 200, "height": 150},
+            {"x": 100, "y": 50, "width": -50, "height": 0},
+        ]
         image_shape = (480, 640)
+        items = [{"bounding_box": dict(b), "class": "box"} for b in bboxes]
         
-        result = validate_coordinates(bbox, image_shape)
+        validate_coordinates_batch(items, image_shape)
         
-        assert result["x"] == 100
-        assert result["y"] == 50
-        assert result["width"] == 1
-        assert result["height"] == 1
+        for item, bbox in zip(items, bboxes):
+            assert item["bounding_box"] == validate_coordinates(bbox, image_shape)
+            assert item["class"] == "box"
     
-    def test_edge_coordinates(self):
-        bbox = {"x": 639, "y": 479, "width": 1, "height": 1}
-        image_shape = (480, 640)  
+    def test_return_type_is_int(self):
+        items = [{"bounding_box": {"x": 100, "y": 50, "width": 200, "height": 150}}]
         
-        result = validate_coordinates(bbox, image_shape)
+        validate_coordinates_batch(items, (480, 640))
         
-        assert result["x"] == 639
-        assert result["y"] == 479
-        assert result["width"] == 1
-        assert result["height"] == 1
+        assert all(isinstance(v, int) for v in items[0]["bounding_box"].values())
     
-    def test_small_image(self):
-        bbox = {"x": 50, "y": 30, "width": 100, "height": 80}
-        image_shape = (60, 80)  
+    def test_empty_list(self):
+        items = []
         
-        result = validate_coordinates(bbox, image_shape)
+        validate_coordinates_batch(items, (480, 640))
         
-        assert result["x"] == 50
-        assert result["y"] == 30
-        assert result["width"] == 30
-        assert result["height"] == 30
-    
-    def test_return_type_is_int(self):
-        bbox = {"x": 100.7, "y": 50.3, "width": 200.9, "height": 150.1}
-        image_shape = (480, 640)
-        
-        result = validate_coordinates(bbox, image_shape)
-        
-        assert isinstance(result["x"], int)
-        assert isinstance(result["y"], int)
-        assert isinstance(result["width"], int)
-        assert isinstance(result["height"], int)
-        
-        assert result["x"] == 100
-        assert result["y"] == 50
-        assert result["width"] == 200
-        assert result["height"] == 150
\ No newline at end of file
+        assert items == []
@@ -1,8 +1,9 @@
 import json
 import os
-import tempfile
 import numpy as np
+import pytest
 from pathlib import Path
+from unittest.mock import patch
 
 
 from src.core.utils.helpers import (
@@ -11,10 +12,33 @@ from src.core.utils.helpers import (
     create_output_directory,
     validate_image_path,
     get_image_files_from_directory,
-    create_directory_structure
+    create_directory_structure,
+    write_image
 )
 
 
+_VALID_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif')
+
+
+@pytest.fixture(scope="session")
+def extension_files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("extensions")
+    paths = {ext: directory / f"image{ext}" for ext in _VALID_EXTENSIONS + ('.txt',)}
+    for path in paths.values():
+        path.touch()
+    return paths
+
+
+@pytest.fixture(scope="session")
+def json_files(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("json")
+    valid = directory / "valid.json"
+    valid.write_text(json.dumps({"key": "value", "number": 42}), encoding="utf-8")
+    invalid = directory / "invalid.json"
+    invalid.write_text("invalid json content", encoding="utf-8")
+    return {"valid": valid, "invalid": invalid}
+
+
 class TestHelpers:
     def test_make_json_serializable_numpy_array(self):
         arr = np.array([[1, 2], [3, 4]])
@@ -60,129 +84,116 @@ class TestHelpers:
         data = {"string": "test", "int": 42, "list": [1, 2, 3]}
         result = make_json_serializable(data)
         assert result == data
+        assert result is not data
+        assert result["list"] is not data["list"]
 
-    def test_load_results_from_json_success(self):
-        test_data = {"key": "value", "number": 42}
+    def test_write_image_success(self, tmp_path):
+        path = tmp_path / "image.jpg"
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(test_data, f)
-            temp_path = f.name
+        assert write_image(str(path), np.zeros((10, 10, 3), dtype=np.uint8)) is True
+        assert path.is_file()
+
+    def test_write_image_missing_directory(self, tmp_path):
+        path = tmp_path / "missing" / "image.jpg"
         
-        try:
-            result = load_results_from_json(temp_path)
-            assert result == test_data
-        finally:
-            os.unlink(temp_path)
+        with patch('src.core.utils.helpers.logger') as mock_logger:
+            assert write_image(str(path), np.zeros((10, 10, 3), dtype=np.uint8)) is False
+        mock_logger.error.assert_called_once()
+        assert not path.exists()
+
+    def test_load_results_from_json_success(self, json_files):
+        result = load_results_from_json(str(json_files["valid"]))
+        assert result == {"key": "value", "number": 42}
 
     def test_load_results_from_json_file_not_found(self):
         result = load_results_from_json("/path/that/does/not/exist.json")
         assert result == {}
 
-    def test_load_results_from_json_invalid_json(self):
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            f.write("invalid json content")
-            temp_path = f.name
-        
-        try:
-            result = load_results_from_json(temp_path)
-            assert result == {}
-        finally:
-            os.unlink(temp_path)
-
-    def test_create_output_directory_with_timestamp(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result_dir = create_output_directory(temp_dir, timestamp=True)
-            
-            assert os.path.exists(result_dir)
-            assert "output_" in os.path.basename(result_dir)
-            assert temp_dir in result_dir
-
-    def test_create_output_directory_without_timestamp(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            test_dir = os.path.join(temp_dir, "test_output")
-            result_dir = create_output_directory(test_dir, timestamp=False)
-            
-            assert os.path.exists(result_dir)
-            assert result_dir == test_dir
-
-    def test_validate_image_path_valid_extensions(self):
-        valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
+    def test_load_results_from_json_invalid_json(self, json_files):
+        result = load_results_from_json(str(json_files["invalid"]))
+        assert result == {}
+
+    @patch('os.makedirs')
+    def test_create_output_directory_with_timestamp(self, mock_makedirs):
+        base_dir = "/base/dir"
+        result_dir = create_output_directory(base_dir, timestamp=True)
         
-        for ext in valid_extensions:
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as f:
-                temp_path = f.name
-            
-            try:
-                assert validate_image_path(temp_path) == True
-            finally:
-                os.unlink(temp_path)
-
-    def test_validate_image_path_invalid_extension(self):
-        with tempfile.NamedTemporaryFile(suffix='.txt', delete=False) as f:
-            temp_path = f.name
+        mock_makedirs.assert_called_once_with(result_dir, exist_ok=True)
+        assert os.path.basename(result_dir).startswith("output_")
+        assert os.path.dirname(result_dir) == base_dir
+
+    def test_create_output_directory_without_timestamp(self, tmp_path):
+        temp_dir = str(tmp_path)
+        test_dir = os.path.join(temp_dir, "test_output")
+        result_dir = create_output_directory(test_dir, timestamp=False)
         
-        try:
-            assert validate_image_path(temp_path) == False
-        finally:
-            os.unlink(temp_path)
+        assert os.path.exists(result_dir)
+        assert result_dir == test_dir
+
+    def test_validate_image_path_valid_extensions(self, extension_files):
+        for ext in _VALID_EXTENSIONS:
+            assert validate_image_path(str(extension_files[ext])) == True
+
+    def test_validate_image_path_invalid_extension(self, extension_files):
+        assert validate_image_path(str(extension_files['.txt'])) == False
 
     def test_validate_image_path_file_not_exists(self):
         assert validate_image_path("/path/that/does/not/exist.jpg") == False
 
-    def test_get_image_files_from_directory_non_recursive(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            image_files = ['test1.jpg', 'test2.png', 'test3.bmp']
-            other_files = ['test.txt', 'test.doc']
-            
-            for filename in image_files + other_files:
-                Path(os.path.join(temp_dir, filename)).touch()
-            
-            result = get_image_files_from_directory(temp_dir, recursive=False)
-            
-            assert len(result) == 3
-            for img_file in image_files:
-                assert any(img_file in path for path in result)
-
-    def test_get_image_files_from_directory_recursive(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            subdir = os.path.join(temp_dir, 'subdir')
-            os.makedirs(subdir)
-            
-            Path(os.path.join(temp_dir, 'root.jpg')).touch()
-            Path(os.path.join(subdir, 'sub.png')).touch()
-            Path(os.path.join(temp_dir, 'test.txt')).touch()
-            
-            result = get_image_files_from_directory(temp_dir, recursive=True)
-            
-            assert len(result) == 2
-            assert any('root.jpg' in path for path in result)
-            assert any('sub.png' in path for path in result)
-
-    def test_get_image_files_from_directory_empty(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = get_image_files_from_directory(temp_dir, recursive=False)
-            assert result == []
-
-    def test_create_directory_structure(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = create_directory_structure(temp_dir)
-            
-            expected_dirs = ["qr_crops", "outputs", "temp", "logs"]
-            
-            assert len(result) == 4
-            for dir_name in expected_dirs:
-                assert dir_name in result
-                assert os.path.exists(result[dir_name])
-                assert temp_dir in result[dir_name]
-
-    def test_create_directory_structure_existing_dirs(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            existing_dir = os.path.join(temp_dir, "qr_crops")
-            os.makedirs(existing_dir)
-            
-            result = create_directory_structure(temp_dir)
-            
-            assert os.path.exists(result["qr_crops"])
-            assert os.path.exists(result["outputs"])
-            assert os.path.exists(result["temp"])
-            assert os.path.exists(result["logs"])
+    def test_get_image_files_from_directory_non_recursive(self, tmp_path):
+        temp_dir = str(tmp_path)
+        image_files = ['test1.jpg', 'test2.png', 'test3.bmp']
+        other_files = ['test.txt', 'test.doc']
+        
+        for filename in image_files + other_files:
+            Path(os.path.join(temp_dir, filename)).touch()
+        
+        result = get_image_files_from_directory(temp_dir, recursive=False)
+        
+        assert len(result) == 3
+        for img_file in image_files:
+            assert any(img_file in path for path in result)
+
+    def test_get_image_files_from_directory_recursive(self, tmp_path):
+        temp_dir = str(tmp_path)
+        subdir = os.path.join(temp_dir, 'subdir')
+        os.makedirs(subdir)
+        
+        Path(os.path.join(temp_dir, 'root.jpg')).touch()
+        Path(os.path.join(subdir, 'sub.png')).touch()
+        Path(os.path.join(temp_dir, 'test.txt')).touch()
+        
+        result = get_image_files_from_directory(temp_dir, recursive=True)
+        
+        assert len(result) == 2
+        assert any('root.jpg' in path for path in result)
+        assert any('sub.png' in path for path in result)
+
+    def test_get_image_files_from_directory_empty(self, tmp_path):
+        temp_dir = str(tmp_path)
+        result = get_image_files_from_directory(temp_dir, recursive=False)
+        assert result == []
+
+    def test_create_directory_structure(self, tmp_path):
+        temp_dir = str(tmp_path)
+        result = create_directory_structure(temp_dir)
+        
+        expected_dirs = ["qr_crops", "outputs", "temp", "logs"]
+        
+        assert len(result) == 4
+        for dir_name in expected_dirs:
+            assert dir_name in result
+            assert os.path.exists(result[dir_name])
+            assert temp_dir in result[dir_name]
+
+    def test_create_directory_structure_existing_dirs(self, tmp_path):
+        temp_dir = str(tmp_path)
+        existing_dir = os.path.join(temp_dir, "qr_crops")
+        os.makedirs(existing_dir)
+        
+        result = create_directory_structure(temp_dir)
+        
+        assert os.path.exists(result["qr_crops"])
+        assert os.path.exists(result["outputs"])
+        assert os.path.exists(result["temp"])
+        assert os.path.exists(result["logs"])
@@ -1,6 +1,7 @@
+import asyncio
 import pytest
 from datetime import datetime
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import Mock, AsyncMock, patch, mock_open
 from fastapi import UploadFile, HTTPException
 from pathlib import Path
 from io import BytesIO
@@ -26,7 +27,7 @@ class TestImageController:
         mock_file = Mock(spec=UploadFile)
         mock_file.filename = "test_image.jpg"
         mock_file.content_type = "image/jpeg"
-        mock_file.read = AsyncMock(return_value=b"fake_image_content")
+        mock_file.read = AsyncMock(side_effect=[b"fake_image_content", b""])
         return mock_file
 
     @pytest.fixture
@@ -34,34 +35,34 @@ class TestImageController:
         mock_file = Mock(spec=UploadFile)
         mock_file.filename = "large_image.jpg"
         mock_file.content_type = "image/jpeg"
-        large_content = b"x" * (11 * 1024 * 1024)
-        mock_file.read = AsyncMock(return_value=large_content)
+        chunk = b"x" * (1024 * 1024)
+        mock_file.read = AsyncMock(side_effect=[chunk] * 20 + [b""])
         return mock_file
 
     def test_controller_initialization(self, mock_controller):
         controller, mock_storage = mock_controller
         
         assert controller.allowed_extensions == {'.jpg', '.png', '.gif'}
+        assert isinstance(controller.allowed_extensions, frozenset)
         assert controller.max_file_size == 10 * 1024 * 1024
 
     @pytest.mark.asyncio
     async def test_upload_and_process_success(self, mock_controller, mock_upload_file):
         controller, mock_storage = mock_controller
         
-        with patch('src.api.controllers.image_controller.aiofiles.open', create=True) as mock_aiofiles, \
+        with patch('src.api.controllers.image_controller.open', mock_open(), create=True) as mock_file_open, \
              patch('src.api.controllers.image_controller.process_image_task') as mock_task, \
-             patch('src.api.controllers.image_controller.uuid.uuid4') as mock_uuid:
+             patch('src.api.controllers.image_controller.secrets.token_hex') as mock_token:
             
-            mock_uuid.return_value = "test-uuid-123"
+            mock_token.return_value = "0123456789abcdef0123456789abcdef"
             mock_task_result = Mock()
             mock_task_result.id = "task-123"
             mock_task.delay.return_value = mock_task_result
             
-            mock_file_handle = AsyncMock()
-            mock_aiofiles.return_value.__aenter__.return_value = mock_file_handle
-            
             result = await controller.upload_and_process(mock_upload_file)
             
+            mock_file_open.return_value.write.assert_called_once_with(b"fake_image_content")
+            assert mock_task.delay.call_args[0][1]["file_size"] == len(b"fake_image_content")
             assert result.task_id == "task-123"
             assert result.status == "pending"
             assert "task_id task-123" in result.message
@@ -110,11 +111,55 @@ class TestImageController:
     async def test_upload_file_too_large(self, mock_controller, large_mock_upload_file):
         controller, _ = mock_controller
         
-        with pytest.raises(HTTPException) as exc_info:
-            await controller.upload_and_process(large_mock_upload_file)
+        with patch('src.api.controllers.image_controller.open', mock_open(), create=True) as mock_file_open, \
+             patch('src.api.controllers.image_controller.os.unlink') as mock_unlink, \
+             patch('src.api.controllers.image_controller.process_image_task') as mock_task:
+            
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.upload_and_process(large_mock_upload_file)
         
         assert exc_info.value.status_code == 413
         assert "muito grande" in exc_info.value.detail
+        
+        # Rejeitado no primeiro bloco acima do limite, sem consumir o restante do corpo
+        assert large_mock_upload_file.read.await_count == 11
+        assert mock_file_open.return_value.write.call_count == 10
+        mock_file_open.return_value.close.assert_called_once()
+        mock_unlink.assert_called_once()
+        mock_task.delay.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upload_concurrency_is_bounded(self, mock_controller):
+        controller, _ = mock_controller
+        controller._upload_semaphore = asyncio.Semaphore(8)
+        
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def slow_save(file, file_path):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 7
+        
+        uploads = []
+        for i in range(16):
+            mock_file = Mock(spec=UploadFile)
+            mock_file.filename = f"test{i}.jpg"
+            mock_file.content_type = "image/jpeg"
+            uploads.append(mock_file)
+        
+        with patch.object(controller, '_save_upload', side_effect=slow_save), \
+             patch('src.api.controllers.image_controller.process_image_task') as mock_task:
+            
+            mock_task.delay.return_value = Mock(id="task-123")
+            
+            results = await asyncio.gather(*(controller.upload_and_process(f) for f in uploads))
+        
+        assert len(results) == 16
+        assert max_in_flight == 8
 
     @pytest.mark.asyncio
     async def test_get_result_found(self, mock_controller):
@@ -130,6 +175,7 @@ class TestImageController:
             
             assert result == expected_result
             mock_storage.get_result.assert_called_once_with("123")
+            mock_storage.get_task_metadata.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_result_not_found_processing(self, mock_controller):
@@ -199,10 +245,12 @@ class TestImageController:
             {"task_id": "2", "status": "pending"},
             {"task_id": "3", "status": "failed"}
         ]
-        mock_storage.list_all_results.return_value = mock_tasks
+        mock_storage.list_results_page.return_value = (3, mock_tasks[:2])
         
         result = await controller.list_results(page=1, limit=2)
         
+        mock_storage.list_results_page.assert_called_once_with(offset=0, limit=2, status=None)
+        
         assert result.total == 3
         assert result.page == 1
         assert result.limit == 2
@@ -216,32 +264,35 @@ class TestImageController:
             {"task_id": "1", "status": "completed"},
             {"task_id": "2", "status": "completed"}
         ]
-        mock_storage.list_results_by_status.return_value = mock_tasks
+        mock_storage.list_results_page.return_value = (2, mock_tasks)
         
         result = await controller.list_results(page=1, limit=50, status="completed")
         
         assert result.total == 2
-        mock_storage.list_results_by_status.assert_called_once_with("completed", 50)
+        mock_storage.list_results_page.assert_called_once_with(offset=0, limit=50, status="completed")
 
     @pytest.mark.asyncio
     async def test_list_results_limit_capping(self, mock_controller):
         controller, mock_storage = mock_controller
         
-        mock_storage.list_all_results.return_value = []
+        mock_storage.list_results_page.return_value = (0, [])
         
         result = await controller.list_results(page=1, limit=200)
         
         assert result.limit == 100
+        mock_storage.list_results_page.assert_called_once_with(offset=0, limit=100, status=None)
 
     @pytest.mark.asyncio
     async def test_list_results_pagination(self, mock_controller):
         controller, mock_storage = mock_controller
         
         mock_tasks = [{"task_id": str(i)} for i in range(10)]
-        mock_storage.list_all_results.return_value = mock_tasks
+        mock_storage.list_results_page.return_value = (10, mock_tasks[3:6])
         
         result = await controller.list_results(page=2, limit=3)
         
+        mock_storage.list_results_page.assert_called_once_with(offset=3, limit=3, status=None)
+        assert result.total == 10
         assert len(result.tasks) == 3
         assert result.tasks[0]["task_id"] == "3"
 
@@ -261,7 +312,7 @@ class TestImageController:
         results = await controller.list_results_by_period(start_date, end_date, 100)
         
         assert len(results) == 2
-        mock_storage.list_results_by_period.assert_called_once_with(start_date, end_date, 100)
+        mock_storage.list_results_by_period.assert_called_once_with(start_date, end_date, 100, status=None)
 
     @pytest.mark.asyncio
     async def test_list_results_by_period_with_status(self, mock_controller):
@@ -271,8 +322,7 @@ class TestImageController:
         end_date = datetime(2024, 1, 31)
         
         mock_results = [
-            {"task_id": "1", "status": "completed"},
-            {"task_id": "2", "status": "failed"}
+            {"task_id": "1", "status": "completed"}
         ]
         mock_storage.list_results_by_period.return_value = mock_results
         
@@ -280,6 +330,9 @@ class TestImageController:
         
         assert len(results) == 1
         assert results[0]["status"] == "completed"
+        mock_storage.list_results_by_period.assert_called_once_with(
+            start_date, end_date, 100, status="completed"
+        )
 
     @pytest.mark.asyncio
     async def test_list_results_by_period_limit_capping(self, mock_controller):
@@ -292,7 +345,7 @@ class TestImageController:
         
         await controller.list_results_by_period(start_date, end_date, 2000)
         
-        mock_storage.list_results_by_period.assert_called_once_with(start_date, end_date, 1000)
+        mock_storage.list_results_by_period.assert_called_once_with(start_date, end_date, 1000, status=None)
 
     @pytest.mark.asyncio
     async def test_delete_result_success(self, mock_controller):
@@ -327,6 +380,18 @@ class TestImageController:
         
         assert result == expected_stats
 
+    @pytest.mark.asyncio
+    async def test_get_storage_stats_shared_between_concurrent_calls(self, mock_controller):
+        controller, mock_storage = mock_controller
+        
+        expected_stats = {"total_tasks": 100, "status_counts": {"completed": 80}}
+        mock_storage.get_storage_stats.return_value = expected_stats
+        
+        results = await asyncio.gather(controller.get_storage_stats(), controller.get_storage_stats())
+        
+        assert results == [expected_stats, expected_stats]
+        mock_storage.get_storage_stats.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_health_check_all_healthy(self, mock_controller):
         controller, mock_storage = mock_controller
@@ -405,6 +470,26 @@ class TestImageController:
             assert result["status"] == "unhealthy"
             assert not all(result["components"]["directories"].values())
 
+    @pytest.mark.asyncio
+    async def test_health_check_shares_celery_inspect(self, mock_controller):
+        controller, mock_storage = mock_controller
+        
+        mock_storage.health_check.return_value = {"status": "healthy"}
+        
+        with patch('src.api.controllers.image_controller.celery_app') as mock_celery, \
+             patch('src.api.controllers.image_controller.os.path.exists') as mock_exists:
+            
+            mock_inspect = Mock()
+            mock_inspect.active.return_value = {"worker1": []}
+            mock_celery.control.inspect.return_value = mock_inspect
+            mock_exists.return_value = True
+            
+            results = await asyncio.gather(controller.health_check(), controller.health_check())
+            await controller.health_check()
+            
+            assert all(r["components"]["celery"]["worker_count"] == 1 for r in results)
+            mock_celery.control.inspect.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_upload_different_file_extensions(self, mock_controller):
         controller, _ = mock_controller
@@ -415,11 +500,11 @@ class TestImageController:
             mock_file = Mock(spec=UploadFile)
             mock_file.filename = f"test{ext}"
             mock_file.content_type = "image/jpeg"
-            mock_file.read = AsyncMock(return_value=b"content")
+            mock_file.read = AsyncMock(side_effect=[b"content", b""])
             
-            with patch('src.api.controllers.image_controller.aiofiles.open', create=True), \
+            with patch('src.api.controllers.image_controller.open', mock_open(), create=True), \
                  patch('src.api.controllers.image_controller.process_image_task') as mock_task, \
-                 patch('src.api.controllers.image_controller.uuid.uuid4'):
+                 patch('src.api.controllers.image_controller.secrets.token_hex'):
                 
                 mock_task_result = Mock()
                 mock_task_result.id = "task-123"
@@ -435,11 +520,11 @@ class TestImageController:
         mock_file = Mock(spec=UploadFile)
         mock_file.filename = "test.JPG"
         mock_file.content_type = "image/jpeg"
-        mock_file.read = AsyncMock(return_value=b"content")
+        mock_file.read = AsyncMock(side_effect=[b"content", b""])
         
-        with patch('src.api.controllers.image_controller.aiofiles.open', create=True), \
+        with patch('src.api.controllers.image_controller.open', mock_open(), create=True), \
              patch('src.api.controllers.image_controller.process_image_task') as mock_task, \
-             patch('src.api.controllers.image_controller.uuid.uuid4'):
+             patch('src.api.controllers.image_controller.secrets.token_hex'):
             
             mock_task_result = Mock()
             mock_task_result.id = "task-123"
@@ -4,7 +4,6 @@ Testes unitários para o pré-processador de imagens.
 
 import pytest
 import numpy as np
-import tempfile
 import cv2
 from unittest.mock import patch
 from src.core.processing.image_preprocessor import ImagePreprocessor, create_preprocessor
@@ -45,20 +44,15 @@ class TestImagePreprocessor:
         assert preprocessor.enhance_contrast is True
         assert preprocessor.minimal_preprocessing is True
 
-    def test_load_image_success(self, preprocessor):
+    def test_load_image_success(self, preprocessor, tmp_path):
         test_image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
-        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as f:
-            cv2.imwrite(f.name, test_image)
-            temp_path = f.name
-        
-        try:
-            loaded_image = preprocessor.load_image(temp_path)
-            assert loaded_image is not None
-            assert loaded_image.shape == (100, 100, 3)
-            assert loaded_image.dtype == np.uint8
-        finally:
-            import os
-            os.unlink(temp_path)
+        temp_path = str(tmp_path / "image.jpg")
+        cv2.imwrite(temp_path, test_image)
+        
+        loaded_image = preprocessor.load_image(temp_path)
+        assert loaded_image is not None
+        assert loaded_image.shape == (100, 100, 3)
+        assert loaded_image.dtype == np.uint8
 
     def test_load_image_file_not_found(self, preprocessor):
         with pytest.raises(ValueError, match="Não foi possível carregar a imagem"):
@@ -71,6 +65,21 @@ class TestImagePreprocessor:
         with pytest.raises(ValueError, match="Não foi possível carregar a imagem"):
             preprocessor.load_image("test.jpg")
 
+    def test_load_image_from_bytes(self, preprocessor):
+        test_image = np.random.randint(0, 255, (100, 120, 3), dtype=np.uint8)
+        ok, encoded = cv2.imencode('.png', test_image)
+        assert ok
+        
+        loaded_image = preprocessor.load_image_from_bytes(encoded.tobytes())
+        
+        assert loaded_image.shape == (100, 120, 3)
+        assert loaded_image.dtype == np.uint8
+        np.testing.assert_array_equal(loaded_image, cv2.cvtColor(test_image, cv2.COLOR_BGR2RGB))
+
+    def test_load_image_from_bytes_invalid(self, preprocessor):
+        with pytest.raises(ValueError, match="Não foi possível decodificar a imagem"):
+            preprocessor.load_image_from_bytes(b"not an image")
+
     def test_resize_image_default_target(self, preprocessor, sample_image):
         resized, scale = preprocessor.resize_image(sample_image)
         
@@ -111,6 +120,15 @@ class TestImagePreprocessor:
         assert enhanced.dtype == np.uint8
         assert not np.array_equal(enhanced, sample_image)
 
+    def test_enhance_image_quality_matches_gamma_formula(self, preprocessor):
+        preprocessor.enhance_contrast = True
+        image = np.repeat(np.arange(256, dtype=np.uint8), 3).reshape(16, 16, 3)
+        
+        enhanced = preprocessor.enhance_image_quality(image)
+        
+        expected = (np.power(image.astype(np.float32) / 255.0, 1.2) * 255).astype(np.uint8)
+        np.testing.assert_array_equal(enhanced, expected)
+
     def test_preprocess_minimal_mode(self, sample_image):
         preprocessor = ImagePreprocessor(minimal_preprocessing=True)
         processed, metadata = preprocessor.preprocess(sample_image)
@@ -161,6 +179,17 @@ class TestImagePreprocessor:
         assert np.all(processed >= 0)
         assert np.all(processed <= 255)
         assert processed.dtype == np.uint8
+        assert processed.nbytes == 640 * 640 * 3
+
+    def test_preprocess_reuses_letterbox_buffer(self, sample_image):
+        preprocessor = ImagePreprocessor(normalize=True, minimal_preprocessing=False)
+        
+        first, _ = preprocessor.preprocess(sample_image)
+        expected = first.copy()
+        second, _ = preprocessor.preprocess(sample_image)
+        
+        assert np.shares_memory(first, second)
+        np.testing.assert_array_equal(second, expected)
 
     def test_create_preprocessor_default(self):
         preprocessor = create_preprocessor()
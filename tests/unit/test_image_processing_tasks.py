@@ -1,7 +1,9 @@
+import types
+import numpy as np
+import orjson
 import pytest
-import os
-import tempfile
-from unittest.mock import Mock, patch
+from datetime import datetime
+from unittest.mock import Mock, create_autospec
 from src.api.tasks.image_processing_tasks import (
     create_initial_result,
     validate_image_path,
@@ -13,32 +15,61 @@ from src.api.tasks.image_processing_tasks import (
 )
 
 
+TASK_ID = "test-task-123"
+IMAGE_PATH = "/path/to/image.jpg"
+METADATA = types.MappingProxyType({"test": "data"})
+
+
+@pytest.fixture(scope="session")
+def vision_processor_spec():
+    # A introspecção do autospec roda uma única vez por sessão
+    from src.core.processing.vision_processor import VisionProcessor
+    return create_autospec(VisionProcessor, instance=True)
+
+
+@pytest.fixture
+def vision_processor_mock(vision_processor_spec, monkeypatch):
+    vision_processor_spec.reset_mock(return_value=True, side_effect=True)
+    create_processor = Mock(return_value=vision_processor_spec)
+    monkeypatch.setattr(
+        'src.api.tasks.image_processing_tasks.create_vision_processor', create_processor
+    )
+    return create_processor, vision_processor_spec
+
+
+@pytest.fixture(scope="session")
+def default_config():
+    # Não deve ser mutado pelos testes: é compartilhado pela sessão
+    return prepare_processing_config()
+
+
+@pytest.fixture
+def task_collaborators(monkeypatch):
+    mocks = (Mock(), Mock(), Mock())
+    for name, mock in zip(("result_storage", "redis_cleaner", "logger"), mocks):
+        monkeypatch.setattr(f'src.api.tasks.image_processing_tasks.{name}', mock)
+    return mocks
+
+
 class TestImageProcessingTaskHelpers:
 
     def test_create_initial_result(self):
-        task_id = "test-task-123"
-        image_path = "/path/to/image.jpg"
-        metadata = {"test": "data"}
-        
-        result = create_initial_result(task_id, image_path, metadata)
+        result = create_initial_result(TASK_ID, IMAGE_PATH, METADATA)
         
         assert result["status"] == "processing"
-        assert result["task_info"]["task_id"] == task_id
-        assert result["task_info"]["image_path"] == image_path
-        assert result["task_info"]["metadata"] == metadata
+        assert result["task_info"]["task_id"] == TASK_ID
+        assert result["task_info"]["image_path"] == IMAGE_PATH
+        assert result["task_info"]["metadata"] == METADATA
         assert "started_at" in result["task_info"]
         
-        result_no_meta = create_initial_result(task_id, image_path)
+        result_no_meta = create_initial_result(TASK_ID, IMAGE_PATH)
         assert result_no_meta["task_info"]["metadata"] == {}
 
-    def test_validate_image_path_success(self):
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_path = temp_file.name
-            
-        try:
-            validate_image_path(temp_path)
-        finally:
-            os.unlink(temp_path)
+    def test_validate_image_path_success(self, tmp_path):
+        temp_path = tmp_path / "image.jpg"
+        temp_path.touch()
+        
+        validate_image_path(str(temp_path))
 
     def test_validate_image_path_failure(self):
         non_existent_path = "/path/that/does/not/exist.jpg"
@@ -46,12 +77,10 @@ class TestImageProcessingTaskHelpers:
         with pytest.raises(FileNotFoundError, match="Imagem não encontrada"):
             validate_image_path(non_existent_path)
 
-    def test_prepare_processing_config_default(self):
-        config = prepare_processing_config()
-        
-        assert "confidence_threshold" in config
-        assert "qr_crops_dir" in config
-        assert "enable_qr_detection" in config
+    def test_prepare_processing_config_default(self, default_config):
+        assert "confidence_threshold" in default_config
+        assert "qr_crops_dir" in default_config
+        assert "enable_qr_detection" in default_config
 
     def test_prepare_processing_config_with_metadata(self):
         custom_config = {
@@ -65,99 +94,93 @@ class TestImageProcessingTaskHelpers:
         assert config["confidence_threshold"] == 0.7
         assert config["save_crops"] == True
 
-    def test_prepare_processing_config_no_config_in_metadata(self):
+    def test_prepare_processing_config_no_config_in_metadata(self, default_config):
         metadata = {"other_data": "value"}
         
         config = prepare_processing_config(metadata)
-        assert "confidence_threshold" in config
+        assert config == default_config
 
     def test_create_success_result(self):
-        task_id = "test-task-123"
-        image_path = "/path/to/image.jpg"
         processing_result = {
             "detected_objects": [],
             "qr_codes": [],
             "summary": {"total_objects": 0}
         }
-        metadata = {"test": "data"}
         
-        result = create_success_result(task_id, image_path, processing_result, metadata)
+        result = create_success_result(TASK_ID, IMAGE_PATH, processing_result, METADATA)
         
         assert result["status"] == "COMPLETED"
-        assert result["task_info"]["task_id"] == task_id
-        assert result["task_info"]["image_path"] == image_path
-        assert result["task_info"]["metadata"] == metadata
+        assert result["task_info"]["task_id"] == TASK_ID
+        assert result["task_info"]["image_path"] == IMAGE_PATH
+        assert result["task_info"]["metadata"] == METADATA
         assert "processed_at" in result["task_info"]
         assert result["detected_objects"] == []
         assert result["qr_codes"] == []
 
     def test_create_error_result(self):
-        task_id = "test-task-123"
-        image_path = "/path/to/image.jpg"
         error_msg = "Test error message"
-        metadata = {"test": "data"}
         
-        result = create_error_result(task_id, image_path, error_msg, metadata)
+        result = create_error_result(TASK_ID, IMAGE_PATH, error_msg, METADATA)
         
         assert result["status"] == "failed"
         assert result["error"] == error_msg
-        assert result["task_info"]["task_id"] == task_id
-        assert result["task_info"]["image_path"] == image_path
-        assert result["task_info"]["metadata"] == metadata
+        assert result["task_info"]["task_id"] == TASK_ID
+        assert result["task_info"]["image_path"] == IMAGE_PATH
+        assert result["task_info"]["metadata"] == METADATA
         assert "processed_at" in result["task_info"]
 
-    @patch('src.api.tasks.image_processing_tasks.result_storage')
-    @patch('src.api.tasks.image_processing_tasks.redis_cleaner')
-    @patch('src.api.tasks.image_processing_tasks.logger')
-    def test_handle_processing_result_success(self, mock_logger, mock_redis_cleaner, mock_result_storage):
+    def test_handle_processing_result_success(self, task_collaborators):
+        mock_result_storage, mock_redis_cleaner, mock_logger = task_collaborators
         mock_result_storage.save_result.return_value = True
-        task_id = "test-task-123"
         result = {"status": "COMPLETED"}
         
-        handle_processing_result(task_id, result)
+        handle_processing_result(TASK_ID, result)
         
-        mock_result_storage.save_result.assert_called_once_with(task_id, result)
-        mock_redis_cleaner.clear_task_result.assert_called_once_with(task_id)
+        mock_result_storage.save_result.assert_called_once_with(TASK_ID, result)
+        mock_redis_cleaner.clear_task_result.assert_called_once_with(TASK_ID)
         mock_logger.error.assert_not_called()
 
-    @patch('src.api.tasks.image_processing_tasks.result_storage')
-    @patch('src.api.tasks.image_processing_tasks.redis_cleaner')
-    @patch('src.api.tasks.image_processing_tasks.logger')
-    def test_handle_processing_result_failure(self, mock_logger, mock_redis_cleaner, mock_result_storage):
+    def test_handle_processing_result_failure(self, task_collaborators):
+        mock_result_storage, mock_redis_cleaner, mock_logger = task_collaborators
         mock_result_storage.save_result.return_value = False
-        task_id = "test-task-123"
         result = {"status": "COMPLETED"}
         
-        handle_processing_result(task_id, result)
+        handle_processing_result(TASK_ID, result)
         
-        mock_result_storage.save_result.assert_called_once_with(task_id, result)
+        mock_result_storage.save_result.assert_called_once_with(TASK_ID, result)
         mock_redis_cleaner.clear_task_result.assert_not_called()
         mock_logger.error.assert_called_once()
 
-    @patch('src.api.tasks.image_processing_tasks.create_vision_processor')
-    def test_process_image_core(self, mock_create_processor):
-        mock_processor = Mock()
-        mock_result = {
-            "detected_objects": [],
-            "qr_codes": [],
-            "summary": {"total_objects": 0}
-        }
+    @pytest.mark.parametrize("config,mock_result", [
+        (
+            {"save_crops": True},
+            {"detected_objects": [], "qr_codes": [], "summary": {"total_objects": 0}}
+        ),
+        (
+            {"save_crops": True, "confidence_threshold": 0.8},
+            {
+                "detected_objects": [{"class": "pallet", "confidence": 0.85}],
+                "qr_codes": [],
+                "summary": {"total_objects": 1}
+            }
+        ),
+    ], ids=["defaults", "with_threshold"])
+    def test_process_image_core(self, vision_processor_mock, config, mock_result):
+        mock_create_processor, mock_processor = vision_processor_mock
         mock_processor.process_image.return_value = mock_result
-        mock_create_processor.return_value = mock_processor
         
-        image_path = "/path/to/image.jpg"
-        config = {"save_crops": True}
         model_path = "/path/to/model.pt"
         
-        result = process_image_core(image_path, config, model_path)
+        result = process_image_core(IMAGE_PATH, config, model_path)
         
         mock_create_processor.assert_called_once_with(model_path, config)
         mock_processor.process_image.assert_called_once_with(
-            image_path,
+            IMAGE_PATH,
             save_qr_crops=True,
             return_visualization=False,
             remove_source_file=True
         )
+        mock_processor.close.assert_called_once()
         assert result == mock_result
 
 
@@ -165,11 +188,11 @@ class TestImageProcessingTask:
     def test_task_helper_functions_integration(self):
         task_id = "test-task-123"
         image_path = "/path/to/image.jpg"
-        metadata = {"config": {"confidence_threshold": 0.7}}
+        metadata = {"config": {"confidence_threshold": 0.7}, "user": "test_user"}
         
         initial_result = create_initial_result(task_id, image_path, metadata)
         assert initial_result["status"] == "processing"
-        assert initial_result["task_info"]["task_id"] == task_id
+        assert "started_at" in initial_result["task_info"]
         
         config = prepare_processing_config(metadata)
         assert config["confidence_threshold"] == 0.7
@@ -182,72 +205,75 @@ class TestImageProcessingTask:
         success_result = create_success_result(task_id, image_path, processing_result, metadata)
         assert success_result["status"] == "COMPLETED"
         assert success_result["detected_objects"] == processing_result["detected_objects"]
+        assert "processed_at" in success_result["task_info"]
         
         error_msg = "Test error"
         error_result = create_error_result(task_id, image_path, error_msg, metadata)
         assert error_result["status"] == "failed"
         assert error_result["error"] == error_msg
+        assert "processed_at" in error_result["task_info"]
+        
+        for result in [initial_result, success_result, error_result]:
+            task_info = result["task_info"]
+            assert task_info["task_id"] == task_id
+            assert task_info["image_path"] == image_path
+            assert task_info["metadata"] == metadata
+
 
-    @patch('src.api.tasks.image_processing_tasks.create_vision_processor')
-    def test_process_image_core_integration(self, mock_create_processor):
-        mock_processor = Mock()
-        mock_result = {
-            "detected_objects": [{"class": "pallet", "confidence": 0.85}],
+class TestCelerySerialization:
+
+    @pytest.fixture
+    def real_processing_result(self, monkeypatch):
+        # Resultado real do VisionProcessor: só o detector e o decoder de QR são simulados
+        from src.core.processing import vision_processor as vp
+        
+        detector = Mock()
+        detector.detect.return_value = {
+            "detected_objects": [{
+                "object_id": "OBJ_1",
+                "class": "pallet",
+                "class_id": np.int64(2),
+                "confidence": np.float32(0.875),
+                "bounding_box": {"x": np.int64(10), "y": np.int64(20), "width": np.int64(100), "height": np.int64(50)}
+            }],
             "qr_codes": [],
-            "summary": {"total_objects": 1}
+            "summary": {"classes_detected": ["pallet"]}
         }
-        mock_processor.process_image.return_value = mock_result
-        mock_create_processor.return_value = mock_processor
+        detector.visualize_detections.side_effect = lambda image, *args, **kwargs: image.copy()
+        qr_decoder = Mock()
+        qr_decoder.decode_qr_from_image.return_value = []
+        monkeypatch.setattr(vp.YOLODetectorSingleton, "get_instance", Mock(return_value=detector))
+        monkeypatch.setattr(vp, "QRDecoder", Mock(return_value=qr_decoder))
         
-        config = {"save_crops": True, "confidence_threshold": 0.8}
-        result = process_image_core("/test/image.jpg", config, "/test/model.pt")
-        
-        assert result == mock_result
-        mock_create_processor.assert_called_once_with("/test/model.pt", config)
-        mock_processor.process_image.assert_called_once_with(
-            "/test/image.jpg",
-            save_qr_crops=True,
-            return_visualization=False,
-            remove_source_file=True
+        processor = vp.VisionProcessor(
+            model_path="/fake/path/model.pt",
+            save_crops=False,
+            save_processed_images=False
         )
-
-    @patch('tempfile.NamedTemporaryFile')
-    def test_validate_image_path_with_real_file(self, mock_temp_file):
-        mock_file = Mock()
-        mock_file.name = "/tmp/test_image.jpg"
-        mock_temp_file.return_value.__enter__.return_value = mock_file
-        
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_path = temp_file.name
-            
         try:
-            validate_image_path(temp_path)
+            result = processor.process_image(
+                np.zeros((240, 320, 3), dtype=np.uint8), return_visualization=True
+            )
         finally:
-            os.unlink(temp_path)
-
-
-    def test_result_creation_consistency(self):
-        task_id = "consistency-test"
-        image_path = "/test/image.jpg"
-        metadata = {"user": "test_user"}
+            processor.close()
         
-        initial = create_initial_result(task_id, image_path, metadata)
-        assert "task_info" in initial
-        assert "started_at" in initial["task_info"]
-        
-        processing_result = {"test": "data"}
-        success = create_success_result(task_id, image_path, processing_result, metadata)
-        assert "task_info" in success
-        assert "processed_at" in success["task_info"]
-        assert success["test"] == "data"  
+        metadata = {"submitted_at": datetime(2024, 7, 29, 14, 30, 12), "config": {"save_crops": False}}
+        return create_success_result(TASK_ID, IMAGE_PATH, result, metadata)
+
+    def test_msgpack_round_trip(self, real_processing_result):
+        from kombu.serialization import dumps, loads
+        from src.api.celery_config import celery_app
         
-        error = create_error_result(task_id, image_path, "error msg", metadata)
-        assert "task_info" in error
-        assert "processed_at" in error["task_info"]
-        assert error["error"] == "error msg"
+        serializer = celery_app.conf.result_serializer
+        content_type, content_encoding, data = dumps(real_processing_result, serializer=serializer)
+        decoded = loads(data, content_type, content_encoding, accept=[content_type])
         
-        for result in [initial, success, error]:
-            task_info = result["task_info"]
-            assert task_info["task_id"] == task_id
-            assert task_info["image_path"] == image_path
-            assert task_info["metadata"] == metadata
+        # Mesmo formato que a API entregaria em JSON: numpy vira lista/número e datetime vira ISO
+        expected = orjson.loads(orjson.dumps(
+            real_processing_result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ))
+        assert serializer == "msgpack"
+        assert decoded == expected
+        assert np.array_equal(np.asarray(decoded["visualization"], dtype=np.uint8), real_processing_result["visualization"])
+        assert decoded["detected_objects"][0]["confidence"] == pytest.approx(0.875)
+        assert decoded["task_info"]["metadata"]["submitted_at"] == "2024-07-29T14:30:12"
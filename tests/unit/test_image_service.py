@@ -2,19 +2,36 @@
 Testes unitários para o serviço de processamento de imagens.
 """
 
+import itertools
+import uuid
 import pytest
 from datetime import datetime
-from src.api.services.image_service import ImageProcessingService, processing_service
+from src.api.services.image_service import ImageProcessingService
 from src.models import ProcessingResult, TaskStatus
 
+# Serviço simulado (não usa o pipeline de visão): fora do loop rápido via -m "not mock_service"
+pytestmark = pytest.mark.mock_service
+
+@pytest.fixture
+def stub_uuid(monkeypatch):
+    # UUIDs reais e determinísticos, sem ler entropia do sistema
+    counter = itertools.count(1)
+    monkeypatch.setattr(uuid, "uuid4", lambda: uuid.UUID(int=next(counter)))
+
+
+@pytest.fixture(scope="class")
+def shared_service():
+    # Somente para testes que não criam tarefas
+    return ImageProcessingService()
+
 
 class TestImageProcessingService:
 
     @pytest.fixture
-    def service(self):
+    def service(self, stub_uuid):
         return ImageProcessingService()
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     async def test_process_image_creates_task(self, service):
         image_path = "/test/path/image.jpg"
         
@@ -25,7 +42,7 @@ class TestImageProcessingService:
         assert len(task_id) == 36 
         assert task_id in service.tasks
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     async def test_process_image_creates_correct_result(self, service):
         image_path = "/test/path/image.jpg"
         
@@ -44,7 +61,7 @@ class TestImageProcessingService:
         assert result.result_data["mock_qr_codes"] == 2
         assert result.result_data["processing_time_ms"] == 150
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     async def test_get_result_existing_task(self, service):
         image_path = "/test/path/image.jpg"
         task_id = await service.process_image(image_path)
@@ -55,22 +72,22 @@ class TestImageProcessingService:
         assert result.task_id == task_id
         assert result.image_path == image_path
 
-    @pytest.mark.asyncio
-    async def test_get_result_nonexistent_task(self, service):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_get_result_nonexistent_task(self, shared_service):
         nonexistent_id = "00000000-0000-0000-0000-000000000000"
         
-        result = await service.get_result(nonexistent_id)
+        result = await shared_service.get_result(nonexistent_id)
         
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_get_all_results_empty(self, service):
-        results = await service.get_all_results()
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_get_all_results_empty(self, shared_service):
+        results = await shared_service.get_all_results()
         
         assert results == {}
         assert len(results) == 0
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     async def test_get_all_results_with_tasks(self, service):
         image_paths = ["/test/image1.jpg", "/test/image2.jpg", "/test/image3.jpg"]
         task_ids = []
@@ -85,7 +102,7 @@ class TestImageProcessingService:
         assert all(task_id in results for task_id in task_ids)
         assert all(isinstance(result, ProcessingResult) for result in results.values())
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     async def test_multiple_process_image_unique_ids(self, service):
         image_path = "/test/path/same_image.jpg"
         task_ids = []
@@ -97,17 +114,19 @@ class TestImageProcessingService:
         assert len(task_ids) == len(set(task_ids))
         assert len(service.tasks) == 5
 
-    def test_service_initialization(self, service):
-        assert hasattr(service, 'tasks')
-        assert isinstance(service.tasks, dict)
-        assert len(service.tasks) == 0
+    def test_service_initialization(self, shared_service):
+        assert hasattr(shared_service, 'tasks')
+        assert isinstance(shared_service.tasks, dict)
+        assert len(shared_service.tasks) == 0
 
     def test_global_service_instance(self):
+        from src.api.services.image_service import processing_service
+        
         assert processing_service is not None
         assert isinstance(processing_service, ImageProcessingService)
         assert hasattr(processing_service, 'tasks')
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     async def test_service_state_persistence(self, service):
         image_path = "/test/path/image.jpg"
         
@@ -1,19 +1,56 @@
 import pytest
+from types import SimpleNamespace as NS
 from unittest.mock import Mock, patch, MagicMock
 from src.api.services.result_storage import ResultStorage
 from src.db.models import VisionResult, VisionTask
 from datetime import datetime
 
 
+_TS1 = datetime(2025, 1, 1)
+_TS2 = datetime(2025, 1, 2)
+_TS3 = datetime(2025, 1, 3)
+_TS_NOON = datetime(2025, 1, 1, 12, 0, 0)
+
+_LIST_TASKS = [
+    NS(task_id="task-1", status="completed", created_at=_TS1, has_result="True"),
+    NS(task_id="task-2", status="processing", created_at=_TS2, has_result="False")
+]
+
+# Resultado e tarefa devolvidos pela consulta em delete_result; só a identidade importa
+_DELETE_SENTINELS = (object(), object())
+
+
+def _make_chain(mock_session, tasks, filtered: bool):
+    query = mock_session.query.return_value
+    if filtered:
+        query = query.filter_by.return_value
+    query.order_by.return_value.limit.return_value.all.return_value = tasks
+
+
+class _FakeSession:
+    """Superfície da Session usada pelo ResultStorage (spec dos mocks)."""
+    def query(self, *entities): ...
+    def execute(self, statement): ...
+    def add(self, instance): ...
+    def delete(self, instance): ...
+    def commit(self): ...
+    def rollback(self): ...
+    def close(self): ...
+
+
+@pytest.fixture(scope="module")
+def _storage_singleton():
+    return ResultStorage()
+
+
 class TestResultStorage:
     @pytest.fixture
-    def storage(self):
-        storage = ResultStorage()
-        mock_session = Mock()
+    def storage(self, _storage_singleton, monkeypatch):
+        mock_session = Mock(spec=_FakeSession)
         
-        storage._get_db = Mock(return_value=mock_session)
+        monkeypatch.setattr(_storage_singleton, "_get_db", Mock(return_value=mock_session))
         
-        return storage, mock_session
+        return _storage_singleton, mock_session
 
     def test_save_result_success(self, storage):
         storage_instance, mock_session = storage
@@ -28,10 +65,6 @@ class TestResultStorage:
         
         mock_session.query.return_value.filter_by.return_value.first.return_value = None
         
-        mock_session.commit.return_value = None
-        mock_session.rollback.return_value = None
-        mock_session.close.return_value = None
-        
         result = storage_instance.save_result(task_id, result_data)
         
         assert result is True
@@ -48,11 +81,9 @@ class TestResultStorage:
             "qr_codes": []
         }
         
-        mock_vision_result = Mock()
-        mock_vision_result.result = expected_result
+        mock_vision_result = NS(result=expected_result)
         
         mock_session.query.return_value.filter_by.return_value.first.return_value = mock_vision_result
-        mock_session.close.return_value = None
         
         result = storage_instance.get_result(task_id)
         
@@ -63,7 +94,6 @@ class TestResultStorage:
         storage_instance, mock_session = storage
         
         mock_session.query.return_value.filter_by.return_value.first.return_value = None
-        mock_session.close.return_value = None
         
         result = storage_instance.get_result("nonexistent-task")
         
@@ -74,71 +104,71 @@ class TestResultStorage:
         
         task_id = "test-task-123"
         
-        mock_task = Mock()
-        mock_task.task_id = task_id
-        mock_task.status = "completed"
-        mock_task.created_at = datetime(2025, 1, 1, 12, 0, 0)
-        mock_task.has_result = "True"
+        mock_task = NS(
+            task_id=task_id,
+            status="completed",
+            created_at=_TS_NOON,
+            has_result="True"
+        )
         
         mock_session.query.return_value.filter_by.return_value.first.return_value = mock_task
-        mock_session.close.return_value = None
         
         result = storage_instance.get_task_metadata(task_id)
         
         assert result["task_id"] == task_id
         assert result["status"] == "completed"
         assert result["has_result"] == "True"
-        assert "created_at" in result
+        assert result["created_at"] == _TS_NOON.isoformat()
 
-    def test_list_all_results(self, storage):
-        """Testa listagem de todos os resultados."""
+    @pytest.mark.parametrize("query_kind,expected_len", [("all", 2), ("by_status", 1)])
+    def test_list_results(self, storage, query_kind, expected_len):
         storage_instance, mock_session = storage
         
-        mock_tasks = [
-            Mock(task_id="task-1", status="completed", created_at=datetime(2025, 1, 1), has_result="True"),
-            Mock(task_id="task-2", status="processing", created_at=datetime(2025, 1, 2), has_result="False")
-        ]
-        
-        mock_session.query.return_value.order_by.return_value.limit.return_value.all.return_value = mock_tasks
-        mock_session.close.return_value = None
+        mock_tasks = _LIST_TASKS[:expected_len]
+        _make_chain(mock_session, mock_tasks, filtered=query_kind == "by_status")
         
-        results = storage_instance.list_all_results(limit=10)
+        if query_kind == "all":
+            results = storage_instance.list_all_results(limit=10)
+        else:
+            results = storage_instance.list_results_by_status("completed", limit=10)
         
-        assert len(results) == 2
-        assert results[0]["task_id"] == "task-1"
-        assert results[1]["task_id"] == "task-2"
+        assert [r["task_id"] for r in results] == [t.task_id for t in mock_tasks]
+        assert [r["status"] for r in results] == [t.status for t in mock_tasks]
+        if query_kind == "by_status":
+            mock_session.query.return_value.filter_by.assert_called_once_with(status="completed")
 
-    def test_list_results_by_status(self, storage):
+    def test_list_results_page(self, storage):
         storage_instance, mock_session = storage
         
         mock_tasks = [
-            Mock(task_id="task-1", status="completed", created_at=datetime(2025, 1, 1), has_result="True")
+            NS(task_id="task-3", status="completed", created_at=_TS3, has_result="True")
         ]
         
-        mock_session.query.return_value.filter_by.return_value.order_by.return_value.limit.return_value.all.return_value = mock_tasks
-        mock_session.close.return_value = None
+        mock_query = mock_session.query.return_value.filter_by.return_value
+        mock_query.count.return_value = 7
+        mock_query.order_by.return_value.offset.return_value.limit.return_value.all.return_value = mock_tasks
         
-        results = storage_instance.list_results_by_status("completed", limit=10)
+        total, results = storage_instance.list_results_page(offset=2, limit=1, status="completed")
         
+        assert total == 7
         assert len(results) == 1
-        assert results[0]["status"] == "completed"
+        assert results[0]["task_id"] == "task-3"
+        mock_session.query.return_value.filter_by.assert_called_once_with(status="completed")
+        mock_query.order_by.return_value.offset.assert_called_once_with(2)
+        mock_query.order_by.return_value.offset.return_value.limit.assert_called_once_with(1)
 
     def test_delete_result(self, storage):
         storage_instance, mock_session = storage
         
         task_id = "test-task-123"
         
-        mock_result = Mock()
-        mock_task = Mock()
-        
-        mock_session.query.return_value.filter_by.return_value.first.side_effect = [mock_result, mock_task]
-        mock_session.close.return_value = None
-        mock_session.commit.return_value = None
+        # side_effect consome a lista como iterador: uma lista nova por teste
+        mock_session.query.return_value.filter_by.return_value.first.side_effect = list(_DELETE_SENTINELS)
         
         success = storage_instance.delete_result(task_id)
         
         assert success is True
-        mock_session.delete.assert_called()
+        assert [c.args[0] for c in mock_session.delete.call_args_list] == list(_DELETE_SENTINELS)
         mock_session.commit.assert_called()
 
     def test_get_storage_stats(self, storage):
@@ -147,14 +177,13 @@ class TestResultStorage:
         mock_session.query.return_value.count.return_value = 5
         
         mock_tasks = [
-            Mock(status="completed"),
-            Mock(status="completed"),
-            Mock(status="processing"),
-            Mock(status="failed"),
-            Mock(status="completed")
+            NS(status="completed"),
+            NS(status="completed"),
+            NS(status="processing"),
+            NS(status="failed"),
+            NS(status="completed")
         ]
         mock_session.query.return_value.all.return_value = mock_tasks
-        mock_session.close.return_value = None
         
         stats = storage_instance.get_storage_stats()
         
@@ -164,27 +193,40 @@ class TestResultStorage:
         assert stats["status_counts"]["failed"] == 1
         assert "timestamp" in stats
 
-    def test_health_check(self, storage):
+    @pytest.mark.parametrize("side_effect,expected_status,expected_connected", [
+        (None, "healthy", True),
+        (Exception("Connection error"), "unhealthy", False),
+    ], ids=["healthy", "unhealthy"])
+    def test_health_check(self, storage, side_effect, expected_status, expected_connected):
         storage_instance, mock_session = storage
         
-        mock_session.execute.return_value = Mock()
-        mock_session.close.return_value = None
+        mock_session.execute.side_effect = side_effect
         
         health = storage_instance.health_check()
         
-        assert health["status"] == "healthy"
-        assert health["database_connected"] is True
+        assert health["status"] == expected_status
+        assert health["database_connected"] is expected_connected
+        assert ("error" in health) is (side_effect is not None)
         assert "timestamp" in health
+        mock_session.close.assert_called_once()
 
-    def test_health_check_error(self, storage):
-        storage_instance, mock_session = storage
-        
-        mock_session.execute.side_effect = Exception("Connection error")
-        mock_session.close.return_value = None
+
+class TestResultStorageDatabase:
+    """Usa o SQLite em memória do conftest; cada teste roda dentro de um SAVEPOINT desfeito ao final."""
+
+    @pytest.fixture
+    def db_storage(self, test_db_session, monkeypatch):
+        storage = ResultStorage()
+        monkeypatch.setattr(storage, "_get_db", lambda: test_db_session)
+        return storage, test_db_session
+
+    # Duas execuções iguais: a segunda só encontra o banco vazio se o rollback da primeira isolou os dados
+    @pytest.mark.parametrize("run", [1, 2])
+    def test_save_result_round_trip_is_isolated(self, db_storage, run):
+        storage, session = db_storage
+        assert session.query(VisionTask).count() == 0
         
-        health = storage_instance.health_check()
+        assert storage.save_result("task-db", {"status": "completed", "qr_codes": []}) is True
         
-        assert health["status"] == "unhealthy"
-        assert health["database_connected"] is False
-        assert "error" in health
-        assert "timestamp" in health
+        assert storage.get_result("task-db") == {"status": "completed", "qr_codes": []}
+        assert storage.get_task_metadata("task-db")["has_result"] == "True"
@@ -0,0 +1,49 @@
+"""
+Testes unitários para os modelos de resultado de visão.
+"""
+
+from src.models import VisionProcessingResult
+
+
+_RESULT_DATA = {
+    "scan_metadata": {
+        "timestamp": "2024-07-29T14:30:12Z",
+        "image_resolution": "640x480",
+        "processing_time_ms": 150,
+        "image_source": "/path/to/image.jpg"
+    },
+    "detected_objects": [{
+        "object_id": "OBJ_001",
+        "class": "pallet",
+        "confidence": 0.92,
+        "bounding_box": {"x": 100, "y": 100, "width": 200, "height": 150}
+    }],
+    "qr_codes": [{
+        "qr_id": "QR_001",
+        "content": "PALLET-42",
+        "decode_source": "direct",
+        "position": {"x": 125, "y": 125},
+        "confidence": 0.95,
+        "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50},
+        "crop_info": {"saved": False}
+    }],
+    "summary": {
+        "total_detections": 2,
+        "objects_count": 1,
+        "qr_codes_count": 1,
+        "classes_detected": ["pallet", "qr_code"],
+        "qr_crops_saved": 0,
+        "qr_codes_decoded": 1
+    }
+}
+
+
+class TestVisionProcessingResult:
+
+    def test_extra_keys_are_kept(self):
+        data = {**_RESULT_DATA, "status": "completed", "task_info": {"task_id": "123"}}
+        
+        result = VisionProcessingResult.model_validate(data)
+        
+        assert result.model_dump()["status"] == "completed"
+        assert result.model_dump()["task_info"] == {"task_id": "123"}
@@ -1,31 +1,112 @@
 import pytest
 import numpy as np
-import tempfile
-import os
-from unittest.mock import Mock, patch, MagicMock
+from datetime import datetime
+from unittest.mock import Mock, call, patch
+from src.core.detection.yolo_detector import YOLODetector
+from src.core.processing.image_preprocessor import ImagePreprocessor
+from src.core.processing.qr_decoder import QRDecoder
 from src.core.processing.vision_processor import VisionProcessor, create_vision_processor
 
 
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+# Conteúdo irrelevante (tudo é mockado); compartilhados entre testes, não devem ser alterados
+_DUMMY_IMAGE = _read_only(np.zeros((480, 640, 3), dtype=np.uint8))
+# Sentinela: os testes só conferem a identidade do overlay devolvido pelo detector
+_DUMMY_VIS_IMAGE = _read_only(np.empty((1, 1, 3), dtype=np.uint8))
+_DUMMY_QR_CROP = _read_only(np.zeros((50, 50, 3), dtype=np.uint8))
+
+# Entradas dos mocks, compartilhadas pelos testes: nenhum deles as altera
+_EMPTY_DET = {"detected_objects": [], "qr_codes": [], "summary": {"classes_detected": []}}
+_META_SCALE1 = {"scale_factor": 1.0}
+
+# _format_qr_codes não altera a entrada
+_QR_DET = ({
+    "qr_id": "QR_001",
+    "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50},
+    "confidence": 0.95
+},)
+
+
+# get_processing_stats só lê os resultados
+_STATS_RESULTS = (
+    {
+        "summary": {
+            "objects_count": 2,
+            "qr_codes_count": 1,
+            "qr_crops_saved": 1,
+            "classes_detected": ["pallet", "box"]
+        },
+        "scan_metadata": {"processing_time_ms": 150}
+    },
+    {
+        "summary": {
+            "objects_count": 1,
+            "qr_codes_count": 0,
+            "qr_crops_saved": 0,
+            "classes_detected": ["forklift"]
+        },
+        "scan_metadata": {"processing_time_ms": 100}
+    },
+    {
+        "error": "Processing failed"
+    }
+)
+
+
+def _wire_empty(mock_prep, mock_detector, mock_qr, mock_convert, image):
+    """Configura o pipeline mockado para não detectar nada."""
+    mock_convert.return_value = _EMPTY_DET
+    mock_prep.preprocess.return_value = (image, _META_SCALE1)
+    mock_detector.detect.return_value = _EMPTY_DET
+    mock_detector.get_qr_crops.return_value = []
+    mock_qr.decode_qr_from_image.return_value = []
+
+
+@pytest.fixture(scope="module")
+def vision_dependencies():
+    # Os patches são aplicados uma vez por módulo; cada teste recebe mocks novos
+    with patch('src.core.processing.vision_processor.YOLODetectorSingleton') as mock_yolo, \
+         patch('src.core.processing.vision_processor.QRDecoder') as mock_qr, \
+         patch('src.core.processing.vision_processor.ImagePreprocessor') as mock_prep, \
+         patch('src.core.processing.vision_processor.os.makedirs'):
+        yield mock_yolo, mock_qr, mock_prep
+
+
+@pytest.fixture(scope="module")
+def pure_processor(vision_dependencies):
+    # Só para testes de formatação, que não alteram o processador nem usam os mocks
+    processor = VisionProcessor(
+        model_path="/fake/path/model.pt",
+        confidence_threshold=0.5,
+        save_crops=False,
+        save_processed_images=False
+    )
+    yield processor
+    processor.close()
+
+
 class TestVisionProcessor:
 
     @pytest.fixture
-    def mock_processor(self):
-        with patch('src.core.processing.vision_processor.YOLODetectorSingleton') as mock_yolo, \
-             patch('src.core.processing.vision_processor.QRDecoder') as mock_qr, \
-             patch('src.core.processing.vision_processor.ImagePreprocessor') as mock_prep, \
-             patch('src.core.processing.vision_processor.os.makedirs'):
-            
-            mock_detector = Mock()
-            mock_yolo.get_instance.return_value = mock_detector
-            
-            processor = VisionProcessor(
-                model_path="/fake/path/model.pt",
-                confidence_threshold=0.5,
-                save_crops=False,
-                save_processed_images=False
-            )
-            
-            return processor, mock_detector, mock_qr.return_value, mock_prep.return_value
+    def mock_processor(self, vision_dependencies):
+        mock_yolo, mock_qr, mock_prep = vision_dependencies
+        # spec: só os métodos reais existem, e um nome errado falha em vez de virar um Mock filho
+        mock_detector = mock_yolo.get_instance.return_value = Mock(spec=YOLODetector)
+        mock_qr.return_value = Mock(spec=QRDecoder)
+        mock_prep.return_value = Mock(spec=ImagePreprocessor)
+        
+        processor = VisionProcessor(
+            model_path="/fake/path/model.pt",
+            confidence_threshold=0.5,
+            save_crops=False,
+            save_processed_images=False
+        )
+        
+        return processor, mock_detector, mock_qr.return_value, mock_prep.return_value
 
     def test_processor_initialization(self, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
@@ -34,29 +115,63 @@ class TestVisionProcessor:
         assert processor.save_crops is False
         assert processor.save_processed_images is False
 
-    def test_process_image_with_detections(self, mock_processor, sample_detection_response):
+    @pytest.mark.parametrize("image_input,kwargs,remove_error,with_detections", [
+        (_DUMMY_IMAGE, {}, None, True),
+        ("/fake/path/image.jpg", {}, None, False),
+        (b"encoded-image", {}, None, False),
+        (_DUMMY_IMAGE, {}, None, False),
+        (_DUMMY_IMAGE, {"return_visualization": True}, None, False),
+        ("/fake/path/image.jpg", {"remove_source_file": True}, None, False),
+        ("/fake/path/image.jpg", {"remove_source_file": True}, OSError("Permission denied"), False),
+    ], ids=["detections", "string_input", "bytes_input", "array_input", "visualization", "remove_ok", "remove_error"])
+    def test_process_image(
+        self, mock_processor, sample_detection_response, monkeypatch,
+        image_input, kwargs, remove_error, with_detections
+    ):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        
-        mock_prep.load_image.return_value = test_image
-        mock_prep.preprocess.return_value = (test_image, {"scale_factor": 1.0, "x_offset": 0, "y_offset": 0})
-        mock_detector.detect.return_value = sample_detection_response
+        mock_prep.load_image.return_value = _DUMMY_IMAGE
+        mock_prep.load_image_from_bytes.return_value = _DUMMY_IMAGE
+        mock_prep.preprocess.return_value = (_DUMMY_IMAGE, {"scale_factor": 1.0, "x_offset": 0, "y_offset": 0})
+        mock_detector.detect.return_value = sample_detection_response if with_detections else _EMPTY_DET
         mock_detector.get_qr_crops.return_value = []
+        mock_detector.visualize_detections.return_value = _DUMMY_VIS_IMAGE
         mock_qr.decode_qr_from_image.return_value = []
         
-        result = processor.process_image(test_image)
+        remove_requested = kwargs.get("remove_source_file", False)
+        mock_remove = Mock(side_effect=remove_error)
+        if remove_requested:
+            monkeypatch.setattr('src.core.processing.vision_processor.os.remove', mock_remove)
+            monkeypatch.setattr('src.core.processing.vision_processor.os.path.exists', lambda path: True)
         
-        assert "scan_metadata" in result
-        assert "detected_objects" in result
-        assert "qr_codes" in result
-        assert "summary" in result
-        assert result["summary"]["objects_count"] == 1
+        result = processor.process_image(image_input, **kwargs)
+        
+        if isinstance(image_input, str):
+            expected_source = image_input
+            mock_prep.load_image.assert_called_once_with(image_input)
+        elif isinstance(image_input, bytes):
+            expected_source = "bytes"
+            mock_prep.load_image_from_bytes.assert_called_once_with(image_input)
+            mock_prep.load_image.assert_not_called()
+        else:
+            expected_source = "array"
+            mock_prep.load_image.assert_not_called()
+        
+        assert result["scan_metadata"]["image_source"] == expected_source
+        assert mock_detector.detect.call_args.kwargs["confidence"] == processor.confidence_threshold
+        assert result["summary"]["objects_count"] == (1 if with_detections else 0)
+        assert result["source_file_removed"] is (remove_requested and remove_error is None)
+        if remove_requested:
+            mock_remove.assert_called_once_with(image_input)
+        if kwargs.get("return_visualization"):
+            assert result["visualization"] is _DUMMY_VIS_IMAGE
+        else:
+            assert "visualization" not in result
 
     def test_process_image_with_qr_codes(self, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        test_image = _DUMMY_IMAGE
         
         qr_detection = {
             "detected_objects": [],
@@ -72,7 +187,7 @@ class TestVisionProcessor:
         
         qr_crop_info = [{
             "qr_id": "QR_001",
-            "crop_array": np.random.randint(0, 255, (50, 50, 3), dtype=np.uint8),
+            "crop_array": _DUMMY_QR_CROP,
             "crop_path": "/fake/path/qr_crop.jpg"
         }]
         
@@ -96,164 +211,130 @@ class TestVisionProcessor:
         with pytest.raises(Exception):
             processor.process_image("/fake/path/image.jpg")
 
-    def test_format_objects(self, mock_processor):
-        processor, _, _, _ = mock_processor
+    def test_finalize_objects_clamps_and_formats(self, pure_processor):
+        processor = pure_processor
         
         raw_objects = [
             {
                 "object_id": "OBJ_001",
                 "class": "pallet",
-                "confidence": 0.92,
-                "bounding_box": {"x": 100, "y": 100, "width": 200, "height": 150}
+                "confidence": 0.91234,
+                "bounding_box": {"x": -10, "y": 400, "width": 200, "height": 150}
             }
         ]
         
-        formatted = processor._format_objects(raw_objects)
+        formatted = processor._finalize_objects(raw_objects, 480, 640)
         
-        assert len(formatted) == 1
-        assert formatted[0]["object_id"] == "OBJ_001"
-        assert formatted[0]["class"] == "pallet"
-        assert formatted[0]["confidence"] == 0.92
+        assert formatted[0]["confidence"] == 0.912
+        assert formatted[0]["bounding_box"] == {"x": 0, "y": 400, "width": 200, "height": 80}
+        assert raw_objects[0]["bounding_box"] == formatted[0]["bounding_box"]
 
-    @patch('src.core.processing.vision_processor.convert_detections_to_original')
-    def test_process_image_string_input(self, mock_convert, mock_processor):
-        processor, mock_detector, mock_qr, mock_prep = mock_processor
-        
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        mock_convert.return_value = {
-            "detected_objects": [],
-            "qr_codes": [],
-            "summary": {"classes_detected": []}
-        }
-        
-        mock_prep.load_image.return_value = test_image
-        mock_prep.preprocess.return_value = (test_image, {"scale_factor": 1.0})
-        mock_detector.detect.return_value = {
-            "detected_objects": [],
-            "qr_codes": [],
-            "summary": {"classes_detected": []}
-        }
-        mock_detector.get_qr_crops.return_value = []
-        mock_qr.decode_qr_from_image.return_value = []
-        
-        result = processor.process_image("/fake/path/image.jpg")
-        
-        assert result["scan_metadata"]["image_source"] == "/fake/path/image.jpg"
-        mock_prep.load_image.assert_called_once_with("/fake/path/image.jpg")
-
-    def test_process_image_array_input(self, mock_processor):
+    @patch('src.core.processing.vision_processor.cv2.imwrite')
+    def test_process_image_visualization_and_save_reuse_overlay(self, mock_imwrite, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
+        processor.save_processed_images = True
+        processor.processed_images_dir = "/fake/output"
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        test_image = _DUMMY_IMAGE
         
         with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert:
-            mock_convert.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            
-            mock_prep.preprocess.return_value = (test_image, {"scale_factor": 1.0})
-            mock_detector.detect.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            mock_detector.get_qr_crops.return_value = []
-            mock_qr.decode_qr_from_image.return_value = []
+            _wire_empty(mock_prep, mock_detector, mock_qr, mock_convert, test_image)
+            mock_detector.visualize_detections.return_value = _DUMMY_VIS_IMAGE
             
-            result = processor.process_image(test_image)
+            result = processor.process_image(test_image, return_visualization=True)
+            processor.close()
             
-            assert result["scan_metadata"]["image_source"] == "array"
-            mock_prep.load_image.assert_not_called()
+            mock_detector.visualize_detections.assert_called_once()
+            assert result["processed_image"]["saved"] is True
+            assert result["visualization"] is _DUMMY_VIS_IMAGE
 
-    def test_process_image_with_visualization(self, mock_processor):
+    @patch('src.core.processing.vision_processor.cv2.imwrite')
+    def test_process_image_saves_before_qr_decoding(self, mock_imwrite, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
+        processor.save_processed_images = True
+        processor.processed_images_dir = "/fake/output"
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        vis_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        
-        with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert:
-            mock_convert.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            
-            mock_prep.preprocess.return_value = (test_image, {"scale_factor": 1.0})
-            mock_detector.detect.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            mock_detector.get_qr_crops.return_value = []
-            mock_detector.visualize_detections.return_value = vis_image
-            mock_qr.decode_qr_from_image.return_value = []
+        with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert, \
+             patch.object(processor, '_save_processed_image', wraps=processor._save_processed_image) as mock_save:
+            _wire_empty(mock_prep, mock_detector, mock_qr, mock_convert, _DUMMY_IMAGE)
+            mock_detector.visualize_detections.return_value = _DUMMY_VIS_IMAGE
+            # A gravação já deve ter sido enviada ao pool quando a decodificação começa
+            mock_qr.decode_qr_from_image.side_effect = lambda image: mock_save.assert_called_once() or []
             
-            result = processor.process_image(test_image, return_visualization=True)
+            result = processor.process_image(_DUMMY_IMAGE)
+            processor.close()
             
-            assert "visualization" in result
-            np.testing.assert_array_equal(result["visualization"], vis_image)
+            mock_qr.decode_qr_from_image.assert_called_once()
+            assert result["processed_image"]["saved"] is True
 
-    @patch('src.core.processing.vision_processor.os.remove')
-    def test_process_image_remove_source_file(self, mock_remove, mock_processor):
+    @patch('src.core.processing.vision_processor.cv2.imwrite', return_value=False)
+    def test_process_image_reports_failed_save(self, mock_imwrite, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
-        
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        processor.save_processed_images = True
+        processor.processed_images_dir = "/fake/output"
         
         with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert, \
-             patch('src.core.processing.vision_processor.os.path.exists', return_value=True):
+             patch('src.core.utils.helpers.logger') as mock_logger:
+            _wire_empty(mock_prep, mock_detector, mock_qr, mock_convert, _DUMMY_IMAGE)
+            mock_detector.visualize_detections.return_value = _DUMMY_VIS_IMAGE
             
-            mock_convert.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
+            result = processor.process_image(_DUMMY_IMAGE)
+            processor.close()
             
-            mock_prep.load_image.return_value = test_image
-            mock_prep.preprocess.return_value = (test_image, {"scale_factor": 1.0})
-            mock_detector.detect.return_value = {
+            assert result["processed_image"]["saved"] is False
+            mock_logger.error.assert_called_once()
+
+    def test_process_image_resolves_qr_crop_saves(self, mock_processor):
+        processor, mock_detector, mock_qr, mock_prep = mock_processor
+        qr_det = {"qr_id": "QR_1", "confidence": 0.9, "bounding_box": {"x": 10, "y": 10, "width": 50, "height": 50}}
+        
+        with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert:
+            _wire_empty(mock_prep, mock_detector, mock_qr, mock_convert, _DUMMY_IMAGE)
+            mock_convert.return_value = {
                 "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
+                "qr_codes": [qr_det],
+                "summary": {"classes_detected": ["qr_code"]}
             }
-            mock_detector.get_qr_crops.return_value = []
-            mock_qr.decode_qr_from_image.return_value = []
+            mock_detector.get_qr_crops.return_value = [{
+                "qr_id": "QR_1",
+                "crop_array": _DUMMY_QR_CROP,
+                "saved_path": "/fake/crops/QR_1_crop.jpg",
+                "save_future": processor._io_pool.submit(lambda: False)
+            }]
+            mock_qr.decode_multiple_attempts.return_value = None
             
-            result = processor.process_image("/fake/path/image.jpg", remove_source_file=True)
+            result = processor.process_image(_DUMMY_IMAGE)
             
-            assert result["source_file_removed"] is True
-            mock_remove.assert_called_once_with("/fake/path/image.jpg")
+            assert result["qr_codes"][0]["crop_info"]["saved"] is False
+            assert result["summary"]["qr_crops_saved"] == 0
 
-    @patch('src.core.processing.vision_processor.os.remove')
-    def test_process_image_remove_source_file_error(self, mock_remove, mock_processor):
+    def test_process_image_qr_detection_disabled(self, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
+        processor.enable_qr_detection = False
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        mock_remove.side_effect = OSError("Permission denied")
+        test_image = _DUMMY_IMAGE
         
-        with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert, \
-             patch('src.core.processing.vision_processor.os.path.exists', return_value=True):
-            
+        with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert:
             mock_convert.return_value = {
                 "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
+                "qr_codes": [
+                    {"qr_id": "QR_1", "confidence": 0.9, "bounding_box": {"x": 10, "y": 10, "width": 50, "height": 50}}
+                ],
+                "summary": {"classes_detected": ["qr_code"]}
             }
             
-            mock_prep.load_image.return_value = test_image
-            mock_prep.preprocess.return_value = (test_image, {"scale_factor": 1.0})
-            mock_detector.detect.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            mock_detector.get_qr_crops.return_value = []
-            mock_qr.decode_qr_from_image.return_value = []
+            mock_prep.preprocess.return_value = (test_image, _META_SCALE1)
             
-            result = processor.process_image("/fake/path/image.jpg", remove_source_file=True)
+            result = processor.process_image(test_image)
             
-            assert result["source_file_removed"] is False
+            mock_detector.get_qr_crops.assert_not_called()
+            mock_qr.decode_multiple_attempts.assert_not_called()
+            mock_qr.decode_qr_from_image.assert_not_called()
+            assert result["qr_codes"] == []
+            assert result["summary"]["qr_codes_count"] == 0
+            assert result["summary"]["qr_codes_decoded"] == 0
+            assert result["summary"]["classes_detected"] == []
+            assert processor.get_processing_stats([result])["classes_summary"] == {}
 
     @patch('src.core.processing.vision_processor.cv2.imwrite')
     def test_save_processed_image(self, mock_imwrite, mock_processor):
@@ -261,134 +342,77 @@ class TestVisionProcessor:
         processor.save_processed_images = True
         processor.processed_images_dir = "/fake/output"
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        vis_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        test_image = _DUMMY_IMAGE
         detections = {"detected_objects": [], "qr_codes": []}
         
-        mock_detector.visualize_detections.return_value = vis_image
+        mock_detector.visualize_detections.return_value = _DUMMY_VIS_IMAGE
         
-        with patch('src.core.processing.vision_processor.datetime') as mock_datetime:
-            mock_now = Mock()
-            mock_now.strftime.return_value = "20240729_143012_123456"
-            mock_datetime.now.return_value = mock_now
-            
-            result_path = processor._save_processed_image(test_image, detections, "/path/to/source.jpg")
-            expected_path = "/fake/output/source_processed_20240729_143012_123.jpg"
-            assert result_path == expected_path
-            mock_imwrite.assert_called_once_with(expected_path, vis_image)
+        now = datetime(2024, 7, 29, 14, 30, 12, 123456)
+        result_path, save_future = processor._save_processed_image(test_image, detections, "/path/to/source.jpg", now)
+        processor.close()
+        expected_path = "/fake/output/source_processed_20240729_143012_123.jpg"
+        assert result_path == expected_path
+        assert save_future.result() is True
+        mock_imwrite.assert_called_once()
+        assert mock_imwrite.call_args[0][0] == expected_path
 
     def test_save_processed_image_array_source(self, mock_processor):
         processor, mock_detector, _, _ = mock_processor
         processor.save_processed_images = True
         processor.processed_images_dir = "/fake/output"
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-        vis_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        test_image = _DUMMY_IMAGE
         detections = {"detected_objects": [], "qr_codes": []}
         
-        mock_detector.visualize_detections.return_value = vis_image
+        mock_detector.visualize_detections.return_value = _DUMMY_VIS_IMAGE
         
-        with patch('src.core.processing.vision_processor.cv2.imwrite') as mock_imwrite, \
-             patch('src.core.processing.vision_processor.datetime') as mock_datetime:
-            
-            mock_now = Mock()
-            mock_now.strftime.return_value = "20240729_143012_123456"
-            mock_datetime.now.return_value = mock_now
-            
-            result_path = processor._save_processed_image(test_image, detections, "array")
+        with patch('src.core.processing.vision_processor.cv2.imwrite') as mock_imwrite:
+            now = datetime(2024, 7, 29, 14, 30, 12, 123456)
+            result_path, save_future = processor._save_processed_image(test_image, detections, "array", now)
+            processor.close()
             
             expected_path = "/fake/output/processed_image_20240729_143012_123.jpg"
             assert result_path == expected_path
-            mock_imwrite.assert_called_once_with(expected_path, vis_image)
+            assert save_future.result() is True
+            mock_imwrite.assert_called_once()
+            assert mock_imwrite.call_args[0][0] == expected_path
 
-    def test_format_qr_codes_with_crops_and_direct(self, mock_processor):
-        processor, _, _, _ = mock_processor
-        
-        qr_detections = [{
-            "qr_id": "QR_001",
-            "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50},
-            "confidence": 0.95
-        }]
-        
-        qr_crops_info = [{
-            "qr_id": "QR_001",
-            "decoded_content": "CROP_CONTENT",
-            "saved_path": "/path/to/crop.jpg",
-            "size": {"width": 50, "height": 50}
-        }]
-        
-        direct_qr_codes = [{
-            "content": "DIRECT_CONTENT",
-            "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50}
-        }]
-        
-        formatted = processor._format_qr_codes(qr_detections, qr_crops_info, direct_qr_codes)
+    @pytest.mark.parametrize("crops,direct,content,source,saved", [
+        (
+            [{
+                "qr_id": "QR_001",
+                "decoded_content": "CROP_CONTENT",
+                "saved": True,
+                "saved_path": "/path/to/crop.jpg",
+                "size": {"width": 50, "height": 50}
+            }],
+            [{"content": "DIRECT_CONTENT", "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50}}],
+            "CROP_CONTENT", "crop", True
+        ),
+        (
+            [],
+            [{"content": "DIRECT_CONTENT", "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50}}],
+            "DIRECT_CONTENT", "direct", False
+        ),
+        ([], [], "PENDING_SCAN", "none", False),
+    ], ids=["crop", "direct", "none"])
+    def test_format_qr_codes(self, pure_processor, crops, direct, content, source, saved):
+        formatted = pure_processor._format_qr_codes(_QR_DET, crops, direct)
         
         assert len(formatted) == 1
         assert formatted[0]["qr_id"] == "QR_001"
-        assert formatted[0]["content"] == "CROP_CONTENT" 
-        assert formatted[0]["decode_source"] == "crop"
-        assert formatted[0]["crop_info"]["saved"] is True
-
-    def test_format_qr_codes_direct_only(self, mock_processor):
-        processor, _, _, _ = mock_processor
-        
-        qr_detections = [{
-            "qr_id": "QR_001",
-            "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50},
-            "confidence": 0.95
-        }]
-        
-        qr_crops_info = []
-        
-        direct_qr_codes = [{
-            "content": "DIRECT_CONTENT",
-            "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50}
-        }]
-        
-        formatted = processor._format_qr_codes(qr_detections, qr_crops_info, direct_qr_codes)
-        
-        assert len(formatted) == 1
-        assert formatted[0]["content"] == "DIRECT_CONTENT"
-        assert formatted[0]["decode_source"] == "direct"
-        assert formatted[0]["crop_info"]["saved"] is False
-
-    def test_format_qr_codes_no_decode(self, mock_processor):
-        processor, _, _, _ = mock_processor
-        
-        qr_detections = [{
-            "qr_id": "QR_001",
-            "bounding_box": {"x": 100, "y": 100, "width": 50, "height": 50},
-            "confidence": 0.95
-        }]
-        
-        formatted = processor._format_qr_codes(qr_detections, [], [])
-        
-        assert len(formatted) == 1
-        assert formatted[0]["content"] == "PENDING_SCAN"
-        assert formatted[0]["decode_source"] == "none"
+        assert formatted[0]["content"] == content
+        assert formatted[0]["decode_source"] == source
+        assert formatted[0]["crop_info"]["saved"] is saved
 
     def test_process_batch_success(self, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
         
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        test_image = _DUMMY_IMAGE
         
         with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert:
-            mock_convert.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            
+            _wire_empty(mock_prep, mock_detector, mock_qr, mock_convert, test_image)
             mock_prep.load_image.return_value = test_image
-            mock_prep.preprocess.return_value = (test_image, {"scale_factor": 1.0})
-            mock_detector.detect.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            mock_detector.get_qr_crops.return_value = []
-            mock_qr.decode_qr_from_image.return_value = []
             
             results = processor.process_batch(["/fake/image1.jpg", "/fake/image2.jpg"])
             
@@ -400,26 +424,15 @@ class TestVisionProcessor:
     def test_process_batch_with_error(self, mock_processor):
         processor, mock_detector, mock_qr, mock_prep = mock_processor
         
-        mock_prep.load_image.side_effect = [
-            np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8),
-            Exception("Error loading image")
-        ]
+        def load_image(path):
+            if path == "/fake/image2.jpg":
+                raise Exception("Error loading image")
+            return _DUMMY_IMAGE
+        
+        mock_prep.load_image.side_effect = load_image
         
         with patch('src.core.processing.vision_processor.convert_detections_to_original') as mock_convert:
-            mock_convert.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            
-            mock_prep.preprocess.return_value = (np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8), {"scale_factor": 1.0})
-            mock_detector.detect.return_value = {
-                "detected_objects": [],
-                "qr_codes": [],
-                "summary": {"classes_detected": []}
-            }
-            mock_detector.get_qr_crops.return_value = []
-            mock_qr.decode_qr_from_image.return_value = []
+            _wire_empty(mock_prep, mock_detector, mock_qr, mock_convert, _DUMMY_IMAGE)
             
             results = processor.process_batch(["/fake/image1.jpg", "/fake/image2.jpg"])
             
@@ -428,34 +441,8 @@ class TestVisionProcessor:
             assert "error" in results[1]
             assert results[1]["error"] == "Error loading image"
 
-    def test_get_processing_stats(self, mock_processor):
-        processor, _, _, _ = mock_processor
-        
-        results = [
-            {
-                "summary": {
-                    "objects_count": 2,
-                    "qr_codes_count": 1,
-                    "qr_crops_saved": 1,
-                    "classes_detected": ["pallet", "box"]
-                },
-                "scan_metadata": {"processing_time_ms": 150}
-            },
-            {
-                "summary": {
-                    "objects_count": 1,
-                    "qr_codes_count": 0,
-                    "qr_crops_saved": 0,
-                    "classes_detected": ["forklift"]
-                },
-                "scan_metadata": {"processing_time_ms": 100}
-            },
-            {
-                "error": "Processing failed"
-            }
-        ]
-        
-        stats = processor.get_processing_stats(results)
+    def test_get_processing_stats(self, pure_processor):
+        stats = pure_processor.get_processing_stats(_STATS_RESULTS)
         
         assert stats["total_images"] == 3
         assert stats["successful_processing"] == 2
@@ -487,18 +474,33 @@ class TestVisionProcessor:
             assert processor.save_processed_images is False
 
 
+# Chamada esperada de create_vision_processor() sem argumentos
+_DEFAULT_CALL = call(
+    None,
+    confidence_threshold=0.85,
+    enable_qr_detection=True,
+    save_crops=False,
+    save_processed_images=False
+)
+
+
 class TestCreateVisionProcessor:
-    @patch('src.core.processing.vision_processor.VisionProcessor')
+    @pytest.fixture
+    def mock_vision_processor(self, monkeypatch):
+        mock_vision_processor = Mock()
+        monkeypatch.setattr('src.core.processing.vision_processor.VisionProcessor', mock_vision_processor)
+        return mock_vision_processor
+
     def test_create_vision_processor_default_config(self, mock_vision_processor):
         mock_instance = Mock()
         mock_vision_processor.return_value = mock_instance
         
         result = create_vision_processor()
         
-        mock_vision_processor.assert_called_once_with(None, confidence_threshold=0.85, enable_qr_detection=True, save_crops=False, save_processed_images=False)
+        assert mock_vision_processor.call_count == 1
+        assert mock_vision_processor.call_args == _DEFAULT_CALL
         assert result == mock_instance
 
-    @patch('src.core.processing.vision_processor.VisionProcessor')
     def test_create_vision_processor_custom_config(self, mock_vision_processor):
         mock_instance = Mock()
         mock_vision_processor.return_value = mock_instance
@@ -525,7 +527,6 @@ class TestCreateVisionProcessor:
         )
         assert result == mock_instance
 
-    @patch('src.core.processing.vision_processor.VisionProcessor')
     def test_create_vision_processor_none_values_filtered(self, mock_vision_processor):
         mock_instance = Mock()
         mock_vision_processor.return_value = mock_instance
@@ -1,9 +1,60 @@
+import os
 import pytest
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 from src.core.detection.yolo_detector import YOLODetector
 
 
+_CLASS_NAMES = {0: "box", 1: "qr_code", 2: "pallet", 3: "forklift"}
+
+
+class _FakeTensor:
+    # Só a cadeia .cpu().numpy() que o detector usa, sobre um array numpy real
+    def __init__(self, array):
+        self._array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._array
+
+
+class _FakeBoxes:
+    def __init__(self, rows):
+        self.data = _FakeTensor(np.asarray(rows, dtype=np.float64).reshape(-1, 6))
+
+    def __len__(self):
+        return len(self.data.numpy())
+
+
+class FakeYOLO:
+    """
+    Modelo falso e determinístico: devolve as mesmas linhas
+    [x1, y1, x2, y2, conf, cls] para cada imagem recebida.
+    """
+
+    def __init__(self, rows, names=_CLASS_NAMES):
+        self.model = SimpleNamespace(names=dict(names))
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, source, **kwargs):
+        self.calls.append(kwargs)
+        count = len(source) if isinstance(source, list) else 1
+        return [SimpleNamespace(boxes=_FakeBoxes(self.rows), names=self.model.names) for _ in range(count)]
+
+
+@pytest.fixture
+def fake_detector():
+    def build(rows):
+        with patch('src.core.detection.yolo_detector.YOLO', return_value=FakeYOLO(rows)):
+            return YOLODetector("/fake/path/model.pt", confidence_threshold=0.5)
+    return build
+
+
 class TestYOLODetector:
 
     @pytest.fixture
@@ -24,18 +75,97 @@ class TestYOLODetector:
         assert detector.model_path == "/fake/path/model.pt"
         assert detector.class_names == {0: "box", 1: "qr_code", 2: "pallet", 3: "forklift"}
 
-    def test_detect_with_valid_image(self, detector):
-        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    @pytest.mark.parametrize("half,cuda,expected", [
+        (True, True, True),
+        (True, False, False),
+        (False, True, False),
+    ], ids=["gpu", "cpu", "disabled"])
+    def test_half_precision(self, mock_yolo_model, half, cuda, expected):
+        with patch('src.core.detection.yolo_detector.YOLO', return_value=mock_yolo_model), \
+             patch('src.core.detection.yolo_detector._cuda_available', return_value=cuda):
+            detector = YOLODetector("/fake/path/model.pt", confidence_threshold=0.5, half=half)
         
         mock_result = Mock()
+        mock_result.boxes = None
+        detector.model.return_value = [mock_result]
+        
+        detector.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+        
+        assert detector.half is expected
+        assert detector.model.call_args.kwargs["half"] is expected
+
+    @pytest.mark.parametrize("cuda,compile_ok,expected", [
+        (False, True, False),
+        (True, True, True),
+        (True, False, False),
+    ], ids=["cpu_noop", "gpu", "gpu_fallback"])
+    def test_detector_compile_flag(self, mock_yolo_model, cuda, compile_ok, expected):
+        original_model = mock_yolo_model.model
+        compiled_model = Mock()
+        mock_compile = Mock(return_value=compiled_model)
+        if not compile_ok:
+            mock_compile.side_effect = RuntimeError("compile failed")
+        
+        with patch('src.core.detection.yolo_detector.YOLO', return_value=mock_yolo_model), \
+             patch('src.core.detection.yolo_detector._cuda_available', return_value=cuda), \
+             patch('torch.compile', mock_compile):
+            detector = YOLODetector("/fake/path/model.pt", confidence_threshold=0.5, compile_model=True)
+        
+        assert detector.compiled is expected
+        assert mock_compile.called is cuda
+        assert detector.model.model is (compiled_model if expected else original_model)
+        assert mock_yolo_model.call_count == (1 if expected else 0)
+
+    @pytest.mark.parametrize("model_path", ["/fake/model.onnx", "/fake/model.engine"])
+    def test_exported_model(self, model_path):
+        exported_model = Mock()
+        exported_model.model = model_path
+        
+        with patch('src.core.detection.yolo_detector.YOLO', return_value=exported_model) as mock_yolo_class, \
+             patch('src.core.detection.yolo_detector._cuda_available', return_value=True):
+            detector = YOLODetector(model_path, confidence_threshold=0.5, compile_model=True)
+        
+        mock_yolo_class.assert_called_once_with(model_path, task="detect")
+        assert detector.exported is True
+        assert detector.half is False
+        assert detector.compiled is False
+        assert detector.class_names == {}
+        
+        mock_result = Mock()
+        mock_result.names = {0: "box", 1: "qr_code"}
         mock_boxes = Mock()
-        mock_boxes.xyxy.cpu.return_value.numpy.return_value = np.array([[100, 100, 200, 200]])
-        mock_boxes.conf.cpu.return_value.numpy.return_value = np.array([0.85])
-        mock_boxes.cls.cpu.return_value.numpy.return_value = np.array([2])
-        mock_boxes.__len__ = Mock(return_value=1) 
+        mock_boxes.data.cpu.return_value.numpy.return_value = np.array([[10, 10, 60, 60, 0.9, 1]])
+        mock_boxes.__len__ = Mock(return_value=1)
         mock_result.boxes = mock_boxes
+        exported_model.return_value = [mock_result]
         
-        detector.model.return_value = [mock_result]
+        result = detector.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+        
+        assert exported_model.call_args.kwargs["half"] is False
+        assert result["qr_codes"][0]["class"] == "qr_code"
+
+    @pytest.mark.parametrize("warmup,fails", [
+        (False, False),
+        (True, False),
+        (True, True),
+    ], ids=["disabled", "enabled", "failure_ignored"])
+    def test_detector_warmup_invoked(self, mock_yolo_model, warmup, fails):
+        if fails:
+            mock_yolo_model.side_effect = RuntimeError("cuda error")
+        
+        with patch('src.core.detection.yolo_detector.YOLO', return_value=mock_yolo_model):
+            detector = YOLODetector("/fake/path/model.pt", confidence_threshold=0.5, warmup=warmup)
+        
+        assert detector.model is mock_yolo_model
+        assert mock_yolo_model.call_count == (1 if warmup else 0)
+        if warmup:
+            dummy = mock_yolo_model.call_args[0][0]
+            assert dummy.shape == (640, 640, 3)
+            assert dummy.dtype == np.uint8
+
+    def test_detect_with_valid_image(self, fake_detector):
+        test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        detector = fake_detector([[100, 100, 200, 200, 0.85, 2]])
         
         result = detector.detect(test_image)
         
@@ -45,25 +175,47 @@ class TestYOLODetector:
         assert len(result["detected_objects"]) == 1
         assert result["detected_objects"][0]["class"] == "pallet"
         assert result["detected_objects"][0]["confidence"] == 0.85
+        assert result["detected_objects"][0]["bounding_box"] == {"x": 100, "y": 100, "width": 100, "height": 100}
+        assert type(result["detected_objects"][0]["class_id"]) is int
+        assert len(detector.model.calls) == 1
 
-    def test_detect_qr_codes(self, detector):
+    def test_detect_qr_codes(self, fake_detector):
         test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        detector = fake_detector([[50, 50, 100, 100, 0.92, 1]])
         
+        result = detector.detect(test_image)
+        
+        assert len(result["qr_codes"]) == 1
+        assert result["qr_codes"][0]["class"] == "qr_code"
+        assert result["qr_codes"][0]["confidence"] == 0.92
+
+    def test_detect_unknown_class_id(self, detector):
         mock_result = Mock()
         mock_boxes = Mock()
-        mock_boxes.xyxy.cpu.return_value.numpy.return_value = np.array([[50, 50, 100, 100]])
-        mock_boxes.conf.cpu.return_value.numpy.return_value = np.array([0.92])
-        mock_boxes.cls.cpu.return_value.numpy.return_value = np.array([1])
-        mock_boxes.__len__ = Mock(return_value=1) 
+        mock_boxes.data.cpu.return_value.numpy.return_value = np.array([[10, 10, 40, 40, 0.7, 7]])
+        mock_boxes.__len__ = Mock(return_value=1)
         mock_result.boxes = mock_boxes
-        
         detector.model.return_value = [mock_result]
         
-        result = detector.detect(test_image)
+        result = detector.detect(np.zeros((64, 64, 3), dtype=np.uint8))
         
-        assert len(result["qr_codes"]) == 1
-        assert result["qr_codes"][0]["class"] == "qr_code"
-        assert result["qr_codes"][0]["confidence"] == 0.92
+        assert detector._class_table[1] == ("qr_code", True)
+        assert result["detected_objects"][0]["class"] == "class_7"
+        assert result["qr_codes"] == []
+
+    def test_detect_with_class_filter(self, mock_yolo_model, detector):
+        with patch('src.core.detection.yolo_detector.YOLO', return_value=mock_yolo_model):
+            filtered = YOLODetector("/fake/path/model.pt", confidence_threshold=0.5, classes=[1])
+        
+        mock_result = Mock()
+        mock_result.boxes = None
+        mock_yolo_model.return_value = [mock_result]
+        
+        filtered.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+        assert mock_yolo_model.call_args.kwargs["classes"] == [1]
+        
+        detector.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+        assert mock_yolo_model.call_args.kwargs["classes"] is None
 
     def test_detect_no_objects(self, detector):
         test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
@@ -78,6 +230,39 @@ class TestYOLODetector:
         assert len(result["qr_codes"]) == 0
         assert result["summary"]["total_objects"] == 0
 
+    def test_detect_batch(self, detector):
+        images = [np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(3)]
+        
+        mock_result = Mock()
+        mock_boxes = Mock()
+        mock_boxes.data.cpu.return_value.numpy.return_value = np.array([[100, 100, 200, 200, 0.85, 2]])
+        mock_boxes.__len__ = Mock(return_value=1) 
+        mock_result.boxes = mock_boxes
+        
+        detector.model.return_value = [mock_result] * len(images)
+        
+        results = detector.detect_batch(images)
+        
+        assert detector.model.call_count == 1
+        assert len(detector.model.call_args[0][0]) == 3
+        assert len(results) == 3
+        for result in results:
+            assert len(result["detected_objects"]) == 1
+            assert result["detected_objects"][0]["class"] == "pallet"
+
+    def test_detect_batch_splits_into_chunks(self, detector):
+        images = [np.zeros((64, 64, 3), dtype=np.uint8) for _ in range(5)]
+        
+        mock_result = Mock()
+        mock_result.boxes = None
+        detector.model.side_effect = lambda batch, **kwargs: [mock_result] * len(batch)
+        
+        results = detector.detect_batch(images, batch_size=2)
+        
+        assert detector.model.call_count == 3
+        assert [len(c[0][0]) for c in detector.model.call_args_list] == [2, 2, 1]
+        assert len(results) == 5
+
     def test_get_qr_crops(self, detector):
         test_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
         
@@ -101,6 +286,70 @@ class TestYOLODetector:
         assert "margin_applied" in crops[0]
         assert crops[0]["margin_applied"] == 5
 
+    def test_get_qr_crops_reports_saved_files(self, detector, tmp_path):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        detections = {
+            "qr_codes": [
+                {"qr_id": "QR_001", "bounding_box": {"x": 10, "y": 10, "width": 20, "height": 20}, "confidence": 0.9}
+            ]
+        }
+        
+        crops = detector.get_qr_crops(test_image, detections, save_directory=str(tmp_path))
+        assert crops[0]["saved"] is True
+        assert os.path.isfile(crops[0]["saved_path"])
+        
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            crops = detector.get_qr_crops(test_image, detections, save_directory=str(tmp_path), io_executor=pool)
+            assert crops[0]["save_future"].result() is True
+
+    def test_get_qr_crops_clamped_to_image(self, detector):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        
+        detections = {
+            "qr_codes": [
+                {"qr_id": "QR_TL", "bounding_box": {"x": 2, "y": 0, "width": 20, "height": 20}, "confidence": 0.9},
+                {"qr_id": "QR_BR", "bounding_box": {"x": 80, "y": 90, "width": 20, "height": 10}, "confidence": 0.8}
+            ]
+        }
+        
+        crops = detector.get_qr_crops(test_image, detections)
+        
+        assert [c["position"] for c in crops] == [{"x": 0, "y": 0}, {"x": 75, "y": 85}]
+        assert [c["size"] for c in crops] == [{"width": 27, "height": 25}, {"width": 25, "height": 15}]
+        assert crops[1]["crop_array"].shape == (15, 25, 3)
+        assert crops[1]["original_bbox"] == {"x": 80, "y": 90, "width": 20, "height": 10}
+
+    def test_get_qr_crops_keeps_image_dtype(self, detector):
+        test_image = np.zeros((100, 100, 3), dtype=np.uint8)
+        
+        detections = {
+            "qr_codes": [
+                {"qr_id": f"QR_{i}", "bounding_box": {"x": 10 * i, "y": 10, "width": 20, "height": 20}, "confidence": 0.9}
+                for i in range(3)
+            ]
+        }
+        
+        crops = detector.get_qr_crops(test_image, detections)
+        
+        for crop in crops:
+            assert crop["crop_array"].dtype == test_image.dtype
+            assert np.shares_memory(crop["crop_array"], test_image)
+            assert all(type(v) is int for v in crop["position"].values())
+
+    def test_compute_crop_bounds_single_matches_bulk(self):
+        from src.core.detection.yolo_detector import _compute_crop_bounds
+        
+        bboxes = [
+            {"x": 2, "y": 0, "width": 20, "height": 20},
+            {"x": 80, "y": 90, "width": 20, "height": 10}
+        ]
+        
+        bulk = _compute_crop_bounds(bboxes, 100, 100, 5)
+        single = [_compute_crop_bounds([bbox], 100, 100, 5)[0] for bbox in bboxes]
+        
+        assert single == bulk == [[0, 0, 27, 25], [75, 85, 100, 100]]
+        assert _compute_crop_bounds([], 100, 100, 5) == []
+
     def test_singleton_reuse_same_parameters(self):
         from src.core.detection.yolo_detector import YOLODetectorSingleton
         
@@ -109,9 +358,7 @@ class TestYOLODetector:
             mock_model.model.names = {0: "box", 1: "qr_code", 2: "pallet", 3: "forklift"}
             mock_yolo_class.return_value = mock_model
             
-            YOLODetectorSingleton._instance = None
-            YOLODetectorSingleton._model_path = None
-            YOLODetectorSingleton._confidence_threshold = None
+            YOLODetectorSingleton._instances.clear()
             
             detector1 = YOLODetectorSingleton.get_instance("/fake/path/model.pt", 0.85)
             
@@ -119,8 +366,9 @@ class TestYOLODetector:
             
             assert detector1 is detector2
             assert mock_yolo_class.call_count == 1  
+            assert mock_model.call_count == 1
 
-    def test_singleton_recreate_different_parameters(self):
+    def test_singleton_reuse_different_threshold(self):
         from src.core.detection.yolo_detector import YOLODetectorSingleton
         
         with patch('src.core.detection.yolo_detector.YOLO') as mock_yolo_class:
@@ -128,16 +376,34 @@ class TestYOLODetector:
             mock_model.model.names = {0: "box", 1: "qr_code", 2: "pallet", 3: "forklift"}
             mock_yolo_class.return_value = mock_model
             
-            YOLODetectorSingleton._instance = None
-            YOLODetectorSingleton._model_path = None
-            YOLODetectorSingleton._confidence_threshold = None
+            YOLODetectorSingleton._instances.clear()
             
             detector1 = YOLODetectorSingleton.get_instance("/fake/path/model.pt", 0.85)
             
             detector2 = YOLODetectorSingleton.get_instance("/fake/path/model.pt", 0.5)
             
+            assert detector1 is detector2
+            assert detector2.confidence_threshold == 0.85
+            assert mock_yolo_class.call_count == 1
+
+    def test_singleton_cache_recalls_prior_params(self):
+        from src.core.detection.yolo_detector import YOLODetectorSingleton
+        
+        with patch('src.core.detection.yolo_detector.YOLO') as mock_yolo_class:
+            mock_model = Mock()
+            mock_model.model.names = {0: "box", 1: "qr_code", 2: "pallet", 3: "forklift"}
+            mock_yolo_class.return_value = mock_model
+            
+            YOLODetectorSingleton._instances.clear()
+            
+            detector1 = YOLODetectorSingleton.get_instance("/fake/path/model.pt", 0.85)
+            detector2 = YOLODetectorSingleton.get_instance("/fake/path/other.pt", 0.85)
+            detector3 = YOLODetectorSingleton.get_instance("/fake/path/model.pt", 0.5)
+            
+            assert detector1 is detector3
             assert detector1 is not detector2
-            assert mock_yolo_class.call_count == 2 
+            assert detector3.confidence_threshold == 0.85
+            assert mock_yolo_class.call_count == 2
 
     def test_singleton_consistent_with_config(self):
         from src.core.detection.yolo_detector import YOLODetectorSingleton
@@ -148,9 +414,7 @@ class TestYOLODetector:
             mock_model.model.names = {0: "box", 1: "qr_code", 2: "pallet", 3: "forklift"}
             mock_yolo_class.return_value = mock_model
             
-            YOLODetectorSingleton._instance = None
-            YOLODetectorSingleton._model_path = None
-            YOLODetectorSingleton._confidence_threshold = None
+            YOLODetectorSingleton._instances.clear()
             
             confidence_threshold = DEFAULT_CONFIG.get("confidence_threshold", 0.85)
             detector1 = YOLODetectorSingleton.get_instance(DEFAULT_MODEL_PATH, confidence_threshold)
@@ -159,3 +423,20 @@ class TestYOLODetector:
             
             assert detector1 is detector2
             assert mock_yolo_class.call_count == 1
+
+
+class TestYOLODetectorBenchmark:
+    # Acompanha o custo do parse das detecções; requer pytest-benchmark (make install-test-deps)
+
+    @pytest.mark.parametrize("n_detections", [1, 50])
+    def test_detect_parse_benchmark(self, request, fake_detector, n_detections):
+        pytest.importorskip("pytest_benchmark")
+        benchmark = request.getfixturevalue("benchmark")
+        
+        rows = [[10 * i, 10, 10 * i + 30, 40, 0.9, i % 4] for i in range(n_detections)]
+        detector = fake_detector(rows)
+        image = np.zeros((640, 640, 3), dtype=np.uint8)
+        
+        result = benchmark(detector.detect, image)
+        
+        assert result["summary"]["total_objects"] + result["summary"]["total_qr_codes"] == n_detections